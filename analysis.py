@@ -0,0 +1,384 @@
+"""
+Module for checking that a level can be finished, without playing it.
+
+Every surface the player can stand on is found from the level data: the
+tops of the rows of static platforms, and the area each moving platform
+covers as it moves. The player's jump is worked out once, frame by frame,
+using the same numbers as Player, and gives how far across the player can
+get by the time it comes down onto a surface a given distance below or
+above the one it jumped from. A search from where the player starts then
+finds every surface it can get to, and whether it can get past the end of
+the level from any of them:
+
+    result = analysis.analyse(levelformat.load_level_data(file_name))
+    result.solvable, result.unreachable
+
+The check is generous: it ignores anything in the way of a jump and
+treats a moving platform as being everywhere it goes at once. So a level it
+says can't be finished can't be, but one it passes may still be too hard.
+Jumping again while falling off the bottom of the screen, which the game
+allows, isn't counted.
+
+Run this module to check every level file, or set constants.CHECK_LEVELS to
+check each level as it is built. Named files that can't be finished make
+the command fail:
+
+    python analysis.py
+    python analysis.py resources/levels/level_02.json
+"""
+import argparse
+import bisect
+import glob
+import os
+import sys
+import time
+
+import pygame
+
+import constants
+import structures
+
+from camera import Camera
+from levelformat import LEVEL_DIRECTORY, load_level_data
+from movingplatforms import CIRCLE, WAYPOINTS
+from spatial import SpatialHash
+
+# The player's rect and how it moves, as in Player
+PLAYER_WIDTH = 66
+PLAYER_HEIGHT = 90
+RUN_SPEED = 6
+JUMP_SPEED = -11
+GRAVITY = 0.35
+
+# Where the player is put on entering a level from the one before it
+START_X = 120
+START_BOTTOM = constants.SCREEN_HEIGHT - 25
+
+# The player is taken back up to the top once its bottom gets this far down
+FALL_OUT_BOTTOM = constants.SCREEN_HEIGHT + PLAYER_HEIGHT * 2
+
+# Size of the cells surfaces are looked up in, a bit more than a jump across
+SURFACE_CELL_SIZE = 400
+
+
+class JumpArc(object):
+    """The path of the player's bottom through a jump from standing, worked
+    out the same way as Player.calc_grav does, frame by frame."""
+
+    def __init__(self):
+        # Rects round half way positions away from zero, so the jump is
+        # worked out below the top of the screen like a real one
+        start = constants.SCREEN_HEIGHT
+        rect = pygame.Rect(0, start - PLAYER_HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT)
+        change_y = JUMP_SPEED
+        # How far below where it jumped from the player's bottom is on each
+        # frame, negative for above, starting with the frame it jumps on
+        self.drops = [0]
+        # First frame the player is coming down on
+        self.top_frame = None
+        # Long enough to fall out of the level from a screen above the top
+        while rect.bottom - start <= FALL_OUT_BOTTOM + constants.SCREEN_HEIGHT:
+            if change_y == 0:
+                change_y = 1
+            else:
+                change_y += GRAVITY
+            rect.y += change_y
+            if change_y > 0 and self.top_frame is None:
+                self.top_frame = len(self.drops)
+            self.drops.append(rect.bottom - start)
+        self.falling = self.drops[self.top_frame :]
+
+    @property
+    def height(self):
+        """Return how high the player's bottom gets."""
+        return -min(self.drops)
+
+    def landing_frame(self, drop):
+        """Return the frame on which the player comes down onto a surface
+        drop pixels below where it jumped from, negative for above, or None
+        if the jump doesn't get that high."""
+        if drop < self.drops[self.top_frame - 1]:
+            return None
+        frame = self.top_frame + bisect.bisect_right(self.falling, drop)
+        if frame >= len(self.drops):
+            return None
+        return frame
+
+
+# Worked out on first use, see jump_arc
+_jump_arc = None
+
+
+def jump_arc():
+    """Return the JumpArc of the player."""
+    global _jump_arc
+    if _jump_arc is None:
+        _jump_arc = JumpArc()
+    return _jump_arc
+
+
+class Surface(object):
+    """Somewhere the player can stand: from left to right, with its top
+    anywhere from top down to lowest. platform is the TileRun or moving
+    platform data it is the top of."""
+
+    def __init__(self, left, right, top, lowest=None, platform=None):
+        self.left = left
+        self.right = right
+        self.top = top
+        self.lowest = top if lowest is None else lowest
+        self.platform = platform
+        self.rect = pygame.Rect(left, top, right - left, self.lowest - top + 1)
+
+    @property
+    def moving(self):
+        return not isinstance(self.platform, structures.TileRun)
+
+    def __repr__(self):
+        if self.moving:
+            return "moving platform from x {} to {}, y {} to {}".format(
+                self.left, self.right, self.top, self.lowest
+            )
+        return "platform from x {} to {} at y {}".format(
+            self.left, self.right, self.top
+        )
+
+    def player_range(self):
+        """Return the first and last x of the player's left side for it to
+        be on this surface."""
+        return self.left - PLAYER_WIDTH + 1, self.right - 1
+
+    def reach(self, drop):
+        """Return how far across the player can get in a jump from here
+        that lands drop pixels below, or None if it can't."""
+        frame = jump_arc().landing_frame(drop)
+        if frame is None:
+            return None
+        return frame * RUN_SPEED
+
+    def can_reach(self, other):
+        """Return whether the player can jump from here onto other."""
+        # Landing lower down leaves longer to move across in
+        reach = self.reach(other.lowest - self.top)
+        if reach is None:
+            return False
+        first, last = self.player_range()
+        other_first, other_last = other.player_range()
+        return first - reach <= other_last and last + reach >= other_first
+
+    def furthest_x(self):
+        """Return the furthest right the player's left side can get from
+        here, jumping off the end and falling out of the level."""
+        return self.player_range()[1] + self.reach(FALL_OUT_BOTTOM - self.top - 1)
+
+
+class _Block(object):
+    """A static platform's rect, for merge_tiles."""
+
+    def __init__(self, rect):
+        self.rect = rect
+
+
+def static_blocks(data):
+    """Return a _Block for each static platform in level data, where
+    Level.build puts them."""
+    tiles = list(data["tiles"])
+    for name, x, y, length in data["floors"]:
+        tiles.extend((name, x + i * 70, y) for i in range(length // 70))
+    blocks = []
+    for name, x, y in tiles:
+        width, height = structures.TILES[name][2:4]
+        blocks.append(_Block(pygame.Rect(x, y - data["y_offset"], width, height)))
+    return blocks
+
+
+def static_surfaces(data):
+    """Return the Surfaces on top of the static platforms of level data.
+    Parts of a row with another row right on top of them are left out."""
+    runs = structures.merge_tiles(static_blocks(data))
+    grid = SpatialHash()
+    for run in runs:
+        grid.add(run)
+
+    surfaces = []
+    for run in runs:
+        rect = run.rect
+        above = pygame.Rect(rect.left, rect.top - 1, rect.width, 1)
+        covered = sorted(
+            (other.rect.left, other.rect.right)
+            for other in grid.query(above)
+            if other is not run
+        )
+        left = rect.left
+        for cover_left, cover_right in covered:
+            if cover_left > left:
+                surfaces.append(Surface(left, cover_left, rect.top, platform=run))
+            left = max(left, cover_right)
+        if left < rect.right:
+            surfaces.append(Surface(left, rect.right, rect.top, platform=run))
+    return surfaces
+
+
+def moving_surface(spec):
+    """Return a Surface covering everywhere a moving platform goes."""
+    width, height = structures.TILES[spec["tile"]][2:4]
+    path = spec["path"]
+    if path is None:
+        speed_x = abs(spec["change_x"])
+        speed_y = abs(spec["change_y"])
+        xs = [spec["x"]]
+        ys = [spec["y"]]
+        # Platforms turn round once they are past their boundaries
+        if speed_x:
+            xs.extend(
+                (spec["boundary_left"] - speed_x, spec["boundary_right"] + speed_x)
+            )
+        if speed_y:
+            ys.extend(
+                (
+                    spec["boundary_top"] - speed_y,
+                    spec["boundary_bottom"] - height + speed_y,
+                )
+            )
+    elif path["type"] == WAYPOINTS:
+        xs = [x for x, _ in path["points"]] + [spec["x"]]
+        ys = [y for _, y in path["points"]] + [spec["y"]]
+    elif path["type"] == CIRCLE:
+        centre_x, centre_y = path["centre"]
+        radius = path["radius"]
+        xs = [centre_x - radius, centre_x + radius]
+        ys = [centre_y - radius, centre_y + radius]
+    return Surface(min(xs), max(xs) + width, min(ys), max(ys), platform=spec)
+
+
+class Analysis(object):
+    """What analyse found out about a level."""
+
+    def __init__(self, surfaces, start, goal_x, reached, path):
+        self.surfaces = surfaces
+        # Surface the player starts on, or None if it falls straight out
+        self.start = start
+        # The level is finished once the player's left side is past this
+        self.goal_x = goal_x
+        self.reached = reached
+        # Surfaces from start to one the end can be reached from, or None
+        self.path = path
+
+    @property
+    def solvable(self):
+        return self.path is not None
+
+    @property
+    def unreachable(self):
+        """Return the surfaces the player can't get to, from left to right."""
+        return sorted(
+            (surface for surface in self.surfaces if surface not in self.reached),
+            key=lambda surface: (surface.left, surface.top),
+        )
+
+
+def start_surface(surfaces, x=START_X, bottom=START_BOTTOM):
+    """Return the surface the player lands on when put in a level at x with
+    its bottom at bottom, or None. The player is stood on top of anything
+    it is put part way into."""
+    below = [
+        surface
+        for surface in surfaces
+        if not surface.moving
+        and surface.top > bottom - PLAYER_HEIGHT
+        and surface.left < x + PLAYER_WIDTH
+        and surface.right > x
+    ]
+    return min(below, key=lambda surface: surface.top, default=None)
+
+
+def analyse(data):
+    """Find which surfaces in level data the player can get to, and whether
+    it can get to the end. Returns an Analysis."""
+    surfaces = static_surfaces(data)
+    surfaces.extend(moving_surface(spec) for spec in data["moving_platforms"])
+    # The player's screen x plus the camera offset, with the camera keeping
+    # the player at its right edge, drops below level_limit past here
+    goal_x = 2 * Camera.RIGHT_EDGE - data["level_limit"]
+
+    grid = SpatialHash(SURFACE_CELL_SIZE)
+    for surface in surfaces:
+        grid.add(surface)
+    top = min((surface.top for surface in surfaces), default=0)
+
+    start = start_surface(surfaces)
+    came_from = {start: None} if start is not None else {}
+    queue = [start] if start is not None else []
+    end = None
+    for surface in queue:
+        if end is None and surface.furthest_x() > goal_x:
+            end = surface
+        # Nothing further away than falling out of the level can be reached
+        reach = surface.reach(FALL_OUT_BOTTOM - surface.top - 1) + PLAYER_WIDTH
+        area = pygame.Rect(
+            surface.left - reach,
+            top,
+            surface.right - surface.left + reach * 2,
+            FALL_OUT_BOTTOM - top,
+        )
+        for other in grid.query(area):
+            if other not in came_from and surface.can_reach(other):
+                came_from[other] = surface
+                queue.append(other)
+
+    path = None
+    if end is not None:
+        path = []
+        while end is not None:
+            path.append(end)
+            end = came_from[end]
+        path.reverse()
+    return Analysis(surfaces, start, goal_x, set(came_from), path)
+
+
+def check(data, name):
+    """Print a warning if level data can't be finished or has surfaces that
+    can't be got to. Returns the Analysis."""
+    result = analyse(data)
+    if not result.solvable:
+        print("{} can't be finished".format(name))
+    for surface in result.unreachable:
+        print("{}: can't get to the {}".format(name, surface))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check levels can be finished.")
+    parser.add_argument("files", nargs="*", help="level files, all of them if none")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(LEVEL_DIRECTORY, "*.json")))
+    failed = False
+    for file_name in files:
+        start = time.perf_counter()
+        result = analyse(load_level_data(file_name))
+        milliseconds = (time.perf_counter() - start) * 1000
+        print(
+            "{}: {}, {} of {} surfaces reachable ({:.1f}ms)".format(
+                file_name,
+                (
+                    "{} jumps to the end".format(len(result.path) - 1)
+                    if result.solvable
+                    else "CAN'T BE FINISHED"
+                ),
+                len(result.reached),
+                len(result.surfaces),
+                milliseconds,
+            )
+        )
+        for surface in result.unreachable:
+            print("    can't get to the {}".format(surface))
+        failed = failed or not result.solvable
+    # The screens at the end of the game aren't meant to be finished, so
+    # only the levels asked for count
+    if failed and args.files:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,512 @@
+"""
+Module for measuring how fast Homeward runs, and spotting when a change
+makes it slower.
+
+Each level is played headless for a number of frames, using the recording
+for it if there is one and the demo script if not. After some warmup frames
+the same frames are timed several times over, and the median of each figure
+is kept. Frames per second, the time taken by each part of a frame, how far
+memory use rises during a frame and peak memory use are saved as JSON:
+
+    python benchmark.py run --output results.json
+    python benchmark.py run --replays recordings/ --render
+
+Recordings are looked for in the replays directory named after the level,
+for example recordings/Level_01.hwr, see replay.py.
+
+How the game copes with much bigger levels is measured by playing
+generated levels with more and more in them, see stress.py:
+
+    python benchmark.py stress --entities 100 1000 10000 --render
+
+Results can then be compared against an earlier run. Anything more than
+threshold worse than the baseline, and by more than could just be noise, is
+reported as a regression, and the command fails:
+
+    python benchmark.py compare baseline.json results.json --threshold 0.1
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import pygame
+
+import game
+import levels
+import simulation
+import stress
+
+from profiler import FrameProfiler
+from replay import Replay
+
+# Levels benchmarked, by default
+LEVELS = [
+    levels.LevelTutorial,
+    levels.Level_01,
+    levels.Level_02,
+    levels.Level_03,
+    levels.Level_04,
+]
+
+# Frames played before timing starts, so caches are full and the level's
+# first frames aren't counted
+WARMUP_FRAMES = 120
+
+# Times the frames are timed, the median of each figure being kept
+REPEATS = 5
+
+# Changes smaller than these are within the noise between two runs, however
+# big they are compared to the baseline. The slowest frames vary far more
+# than the average one, with whatever else the machine is doing.
+NOISE_MS = 0.02
+NOISE_P99_MS = 0.5
+NOISE_KB = 1.0
+
+# Figures compared between runs, all better smaller, and the noise in each.
+# Frames per second isn't, as it is the same as the mean frame time.
+METRICS = (
+    ("frame_ms.mean", NOISE_MS),
+    ("frame_ms.p99", NOISE_P99_MS),
+    ("frame_peak_kb", NOISE_KB),
+    ("peak_kb", NOISE_KB),
+)
+
+
+class Session(object):
+    """Plays a level over and over, from a recording or the demo script,
+    starting it again whenever the player leaves it."""
+
+    def __init__(
+        self, level_no, render=False, replay=None, level_classes=None, profile=True
+    ):
+        if replay is not None and replay.level_no != level_no:
+            raise ValueError(
+                "The recording is of {}, not {}".format(
+                    game.LEVELS[replay.level_no].__name__,
+                    game.LEVELS[level_no].__name__,
+                )
+            )
+        self.level_no = level_no
+        self.render = render
+        self.replay = replay
+        self.level_classes = level_classes
+        self.profile = profile
+        self.simulation = None
+        self.inputs = None
+        self.restart()
+
+    def restart(self):
+        if self.replay is not None:
+            self.simulation = simulation.Simulation.from_replay(
+                self.replay, self.render
+            )
+            self.inputs = self.replay.step_inputs()
+        else:
+            self.simulation = simulation.Simulation(
+                self.level_no, self.render, level_classes=self.level_classes
+            )
+            self.inputs = simulation.scripted_inputs(simulation.DEMO_SCRIPT, loop=True)
+        self.reset_profiler()
+
+    def reset_profiler(self):
+        """Give the game a new profiler, which keeps every timing rather
+        than a window of recent ones."""
+        self.simulation.game.profiler = FrameProfiler(enabled=self.profile, window=None)
+
+    @property
+    def profiler(self):
+        return self.simulation.game.profiler
+
+    def next_input(self):
+        """Return the input for the next frame, starting again if the level
+        or recording has come to an end."""
+        finished = self.simulation.game.current_level_no != self.level_no
+        step_input = None if finished else next(self.inputs, None)
+        if step_input is None:
+            self.restart()
+            step_input = next(self.inputs)
+        return step_input
+
+    def step(self, step_input):
+        if self.replay is not None:
+            for kind, action in step_input:
+                self.simulation.game.queue(kind, action)
+            self.simulation.step()
+        else:
+            self.simulation.step(step_input)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[int(fraction * (len(values) - 1))]
+
+
+def summarise(times):
+    """Return the mean, median, 99th percentile and max of some times in
+    seconds, in milliseconds."""
+    return {
+        "mean": sum(times) / len(times) * 1000,
+        "p50": percentile(times, 0.5) * 1000,
+        "p99": percentile(times, 0.99) * 1000,
+        "max": max(times) * 1000,
+    }
+
+
+def median(values):
+    return percentile(values, 0.5)
+
+
+def median_results(results):
+    """Return the median of each number in a list of results of the same
+    shape, such as dicts of numbers."""
+    first = results[0]
+    if isinstance(first, dict):
+        return {
+            key: median_results([result[key] for result in results])
+            for key in first
+            if all(key in result for result in results)
+        }
+    if isinstance(first, list):
+        return [median_results(values) for values in zip(*results)]
+    return median(results)
+
+
+def benchmark_session(make_session, frames, warmup=WARMUP_FRAMES, repeats=REPEATS):
+    """Time frames frames of the session made by make_session, after warmup
+    frames, repeats times over and return the median figures. Memory is
+    measured in another pass with tracemalloc on and the profiler off, as
+    tracing slows everything down."""
+    passes = [_time_session(make_session, frames, warmup) for _ in range(repeats)]
+    result = median_results(passes)
+    result.update(_measure_memory(make_session, frames, warmup))
+    result["warmup"] = warmup
+    result["repeats"] = repeats
+    return result
+
+
+def _time_session(make_session, frames, warmup):
+    session = make_session()
+    for _ in range(warmup):
+        session.step(session.next_input())
+    session.reset_profiler()
+
+    phases = {}
+    # Made up front, so growing it isn't timed along with the frames
+    frame_times = [0.0] * frames
+    restarts = 0
+    for frame in range(frames):
+        profiler = session.profiler
+        step_input = session.next_input()
+        if session.profiler is not profiler:
+            restarts += 1
+            # Keep the timings of the game that has just been left
+            for name, timings in profiler.timings.items():
+                phases.setdefault(name, []).extend(timings)
+        frame_start = time.perf_counter()
+        session.step(step_input)
+        frame_times[frame] = time.perf_counter() - frame_start
+    # Building the level again when it is restarted isn't counted
+    seconds = sum(frame_times)
+    for name, timings in session.profiler.timings.items():
+        phases.setdefault(name, []).extend(timings)
+
+    return {
+        "frames": frames,
+        "seconds": seconds,
+        "fps": frames / seconds if seconds else 0.0,
+        "restarts": restarts,
+        "frame_ms": summarise(frame_times),
+        "phases": {name: summarise(times) for name, times in phases.items()},
+    }
+
+
+def _measure_memory(make_session, frames, warmup):
+    """Play the frames again without profiling, and return how far memory
+    use rises above where it started during a frame on average, peak
+    memory use and how many garbage collections there were. Memory freed
+    during a frame only counts as far as the frame's peak, so this is
+    less than the total allocated. Nothing is kept for each frame, so only the game's own
+    memory is counted."""
+    session = make_session(profile=False)
+    tracemalloc.start()
+    for _ in range(warmup):
+        session.step(session.next_input())
+
+    gc.collect()
+    collections = [stats["collections"] for stats in gc.get_stats()]
+    peak = tracemalloc.get_traced_memory()[1]
+    rise = 0
+    for _ in range(frames):
+        step_input = session.next_input()
+        start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        session.step(step_input)
+        frame_peak = tracemalloc.get_traced_memory()[1]
+        rise += frame_peak - start
+        peak = max(peak, frame_peak)
+    collections = [
+        stats["collections"] - before
+        for stats, before in zip(gc.get_stats(), collections)
+    ]
+    tracemalloc.stop()
+
+    return {
+        "frame_peak_kb": rise / frames / 1024,
+        "gc_collections": collections,
+        "peak_kb": peak / 1024,
+    }
+
+
+def run(
+    level_classes=None,
+    frames=1800,
+    render=False,
+    replay_dir=None,
+    warmup=WARMUP_FRAMES,
+    repeats=REPEATS,
+):
+    """Benchmark each level and return the results."""
+    simulation.init_display()
+    results = {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "frames": frames,
+        "warmup": warmup,
+        "repeats": repeats,
+        "render": render,
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "levels": {},
+    }
+    for level_class in level_classes or LEVELS:
+        name = level_class.__name__
+        level_no = game.LEVELS.index(level_class)
+        replay = None
+        if replay_dir is not None:
+            replay_file = os.path.join(replay_dir, name + ".hwr")
+            if os.path.exists(replay_file):
+                replay = Replay.load(replay_file)
+
+        def make_session(profile=True):
+            return Session(level_no, render, replay, profile=profile)
+
+        result = benchmark_session(make_session, frames, warmup, repeats)
+        result["input"] = "replay" if replay is not None else "script"
+        results["levels"][name] = result
+    return results
+
+
+def run_stress(
+    entity_counts,
+    frames=600,
+    render=False,
+    seed=0,
+    warmup=WARMUP_FRAMES,
+    repeats=REPEATS,
+):
+    """Benchmark generated levels with about each number of entities in
+    them, half enemies and half platforms. Returns the results."""
+    simulation.init_display()
+    results = {
+        "frames": frames,
+        "warmup": warmup,
+        "repeats": repeats,
+        "render": render,
+        "seed": seed,
+        "levels": {},
+    }
+    for entities in entity_counts:
+        # Wider levels for more entities, so they aren't all on screen. There
+        # are about as many floating tiles as columns covered by platforms
+        width = max(10000, entities * 10)
+        data = stress.generate(
+            seed,
+            width,
+            tile_density=min(1.0, entities / 2 * 70 / width),
+            moving_platforms=max(entities // 100, 5),
+            flies=entities // 4,
+            slimes=entities // 4,
+        )
+        level_classes = stress.stress_levels(data)
+
+        def make_session(profile=True):
+            return Session(0, render, level_classes=level_classes, profile=profile)
+
+        result = benchmark_session(make_session, frames, warmup, repeats)
+        result["entities"] = stress.count(data)
+        result["width"] = width
+        results["levels"][str(entities)] = result
+    return results
+
+
+def print_stress_results(results):
+    print(
+        "{:>9} {:>7} {:>7} {:>7} {:>9} {:>9} {:>9} {:>9}".format(
+            "entities",
+            "tiles",
+            "moving",
+            "enemies",
+            "fps",
+            "level ms",
+            "player ms",
+            "draw ms",
+        )
+    )
+    for result in results["levels"].values():
+        phases = result["phases"]
+        counts = result["entities"]
+        print(
+            "{:>9} {:>7} {:>7} {:>7} {:>9.0f} {:>9.3f} {:>9.3f} {:>9.3f}".format(
+                sum(counts.values()),
+                counts["tiles"],
+                counts["moving_platforms"],
+                counts["enemies"],
+                result["fps"],
+                phases["level"]["mean"],
+                phases["player"]["mean"],
+                phases["draw"]["mean"] if "draw" in phases else 0.0,
+            )
+        )
+
+
+def metric(result, name):
+    for key in name.split("."):
+        result = result[key]
+    return result
+
+
+def has_metric(result, name):
+    """Return whether result has a figure, which older results may not."""
+    try:
+        metric(result, name)
+    except KeyError:
+        return False
+    return True
+
+
+def compare(baseline, results, threshold=0.1):
+    """Return a line for each figure of each level in both baseline and
+    results, and a list of the regressions: worse by more than threshold,
+    and by more than the noise in that figure."""
+    lines = []
+    regressions = []
+    for name, result in results["levels"].items():
+        base = baseline["levels"].get(name)
+        if base is None:
+            continue
+        figures = [
+            (figure, noise)
+            for figure, noise in METRICS
+            if has_metric(base, figure) and has_metric(result, figure)
+        ]
+        figures.extend(
+            ("phases.{}.mean".format(phase), NOISE_MS)
+            for phase in result["phases"]
+            if phase in base["phases"]
+        )
+        for figure, noise in figures:
+            old = metric(base, figure)
+            new = metric(result, figure)
+            change = (new - old) / abs(old) if old else 0.0
+            line = "{:<14} {:<18} {:>10.3f} {:>10.3f} {:>+7.1%}".format(
+                name, figure, old, new, change
+            )
+            if new - old > noise and change > threshold:
+                line += "  REGRESSION"
+                regressions.append((name, figure, old, new))
+            lines.append(line)
+    return lines, regressions
+
+
+def print_results(results):
+    print(
+        "{:<14} {:>9} {:>9} {:>9} {:>10} {:>9}".format(
+            "level", "fps", "mean ms", "p99 ms", "frame kB", "peak kB"
+        )
+    )
+    for name, result in results["levels"].items():
+        print(
+            "{:<14} {:>9.0f} {:>9.3f} {:>9.3f} {:>10.2f} {:>9.0f}".format(
+                name,
+                result["fps"],
+                result["frame_ms"]["mean"],
+                result["frame_ms"]["p99"],
+                result["frame_peak_kb"],
+                result["peak_kb"],
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Homeward.")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    run_parser = commands.add_parser("run", help="benchmark every level")
+    run_parser.add_argument("--frames", type=int, default=1800)
+    run_parser.add_argument("--warmup", type=int, default=WARMUP_FRAMES)
+    run_parser.add_argument("--repeats", type=int, default=REPEATS)
+    run_parser.add_argument("--render", action="store_true", help="draw every frame")
+    run_parser.add_argument("--replays", metavar="DIR", help="recordings to play")
+    run_parser.add_argument("--output", metavar="FILE", help="save results to FILE")
+
+    stress_parser = commands.add_parser("stress", help="benchmark generated levels")
+    stress_parser.add_argument(
+        "--entities", type=int, nargs="+", default=[100, 1000, 10000]
+    )
+    stress_parser.add_argument("--frames", type=int, default=600)
+    stress_parser.add_argument("--warmup", type=int, default=WARMUP_FRAMES)
+    stress_parser.add_argument("--repeats", type=int, default=REPEATS)
+    stress_parser.add_argument("--seed", type=int, default=0)
+    stress_parser.add_argument("--render", action="store_true", help="draw every frame")
+    stress_parser.add_argument("--output", metavar="FILE", help="save results to FILE")
+
+    compare_parser = commands.add_parser("compare", help="compare two runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+
+    args = parser.parse_args()
+
+    if args.command in ("run", "stress"):
+        if args.command == "run":
+            results = run(
+                frames=args.frames,
+                render=args.render,
+                replay_dir=args.replays,
+                warmup=args.warmup,
+                repeats=args.repeats,
+            )
+            print_results(results)
+        else:
+            results = run_stress(
+                args.entities,
+                args.frames,
+                args.render,
+                args.seed,
+                args.warmup,
+                args.repeats,
+            )
+            print_stress_results(results)
+        if args.output:
+            with open(args.output, "w") as results_file:
+                json.dump(results, results_file, indent=2)
+    else:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        with open(args.results) as results_file:
+            results = json.load(results_file)
+        lines, regressions = compare(baseline, results, args.threshold)
+        print("\n".join(lines))
+        if regressions:
+            print("{} regressions".format(len(regressions)))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Module for the camera, which decides what part of a level is on screen.
+"""
+import pygame
+
+import constants
+
+
+class Camera(object):
+    """Keeps track of how far a level has been scrolled.
+
+    Sprites stay in world coordinates and the camera's offset is only
+    applied when they are drawn, so scrolling costs the same however big
+    the level is. A sprite at world x is drawn at screen x + offset."""
+
+    # The player is kept between these two screen positions while scrolling
+    LEFT_EDGE = 120
+    RIGHT_EDGE = 500
+
+    def __init__(self):
+        # How far the world has been scrolled left/right
+        self.offset = 0
+
+    def scroll(self, shift_x):
+        """Scroll the world by shift_x pixels."""
+        self.offset += shift_x
+
+    def to_screen_x(self, x):
+        """Convert a world x position to a screen one."""
+        return x + self.offset
+
+    def to_world_x(self, x):
+        """Convert a screen x position to a world one."""
+        return x - self.offset
+
+    def apply(self, rect):
+        """Return a copy of a world rect moved to where it is on screen."""
+        return rect.move(self.offset, 0)
+
+    def view(self):
+        """Return the part of the world that is on screen."""
+        return pygame.Rect(
+            -self.offset, 0, constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT
+        )
+
+    def follow(self, target):
+        """Scroll so that target stays between the left and right edges."""
+
+        # If the player gets near the right side, shift the world left (-x)
+        screen_x = self.to_screen_x(target.rect.x)
+        if screen_x >= self.RIGHT_EDGE:
+            self.scroll(self.RIGHT_EDGE - screen_x)
+
+        # If the player gets near the left side, shift the world right (+x)
+        screen_x = self.to_screen_x(target.rect.x)
+        if (
+            screen_x <= self.LEFT_EDGE and self.offset < -1
+        ):  # -1 to prevent edge of wall being seen
+            self.scroll(self.LEFT_EDGE - screen_x)
+
+    def draw(self, screen, sprites):
+        """Draw sprites where the camera sees them. Returns the areas of the
+        screen drawn on."""
+        offset = self.offset
+        return [
+            screen.blit(sprite.image, sprite.rect.move(offset, 0)) for sprite in sprites
+        ]
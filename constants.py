@@ -10,3 +10,37 @@ BLUE = (0, 0, 255)
 # Screen dimensions
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
+
+# Only redraw the parts of the screen that changed, rather than the whole
+# screen every frame. Helps slow machines, mostly on screens that don't scroll.
+DIRTY_RECT_RENDERING = False
+
+# The game is simulated at a fixed number of steps a second, whatever rate
+# the screen is drawn at
+STEPS_PER_SECOND = 60
+# Most steps to run in one frame when the game falls behind
+MAX_CATCH_UP_STEPS = 5
+# Limit on frames drawn a second, 0 for no limit
+MAX_FPS = 60
+# Draw sprites part way between steps so movement looks smooth
+INTERPOLATE = True
+
+# Levels wider than this are only built a chunk at a time, as the camera
+# gets near each chunk
+STREAMING_MIN_WIDTH = SCREEN_WIDTH * 10
+CHUNK_WIDTH = 1400
+
+# Enemies further than this off screen are only moved on every
+# ENEMY_LOD_STEP frames
+ENEMY_LOD_MARGIN = 300
+ENEMY_LOD_STEP = 8
+# Levels with at least this many enemies move them all at once with NumPy,
+# if it is installed
+ENEMY_BATCH_MIN = 100
+
+# Set to a file name to record each session to it, see replay.py
+RECORD_FILE = None
+
+# Warn if a level can't be finished, or has platforms that can't be got to,
+# as it is built, see analysis.py
+CHECK_LEVELS = False
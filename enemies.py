@@ -1,7 +1,9 @@
 import pygame
 import constants
+import enemybatch
+import timing
 
-from spritesheet import SpriteSheet
+from spritesheet import SpriteSheet, overlaps
 
 FLY_DEAD = (143, 0, 59, 33)
 FLY_WINGS_UP = (0, 34, 72, 36)
@@ -32,6 +34,56 @@ class Enemy(pygame.sprite.Sprite):
 
         self.level = None
 
+    def touches_player(self):
+        """Return whether the enemy is touching the player. Their rects
+        are compared first, and only if those overlap are their pixels, so
+        the padding around the images doesn't count."""
+        return pygame.sprite.collide_rect(self, self.player) and overlaps(
+            self, self.player
+        )
+
+    def hit_player(self):
+        """Called when the enemy touches the player. Landing on an enemy
+        kills it, anything else hurts the player."""
+        if not self.player.invincible:
+            if self.player.change_y > 0:
+                self.alive = False
+                self.time_killed = timing.get_ticks()
+                self.bounce_player()
+                self.player.score += 10
+            else:
+                self.player.hit()
+
+    def advance(self, steps):
+        """Move the enemy along its patrol as if update had been called
+        steps times without it touching the player. Whole stretches between
+        turns are done at once rather than a step at a time."""
+        x = self.rect.x
+        change_x = self.change_x
+        left = self.boundary_left
+        right = self.boundary_right
+        while steps > 0 and change_x:
+            if change_x > 0:
+                if x + change_x < left:
+                    # Outside the patrol, turns after one step
+                    run = 1
+                else:
+                    run = max((right - x) // change_x + 1, 1)
+            else:
+                if x + change_x > right:
+                    run = 1
+                else:
+                    run = max((x - left) // -change_x + 1, 1)
+
+            if run > steps:
+                x += change_x * steps
+                break
+            x += change_x * run
+            steps -= run
+            change_x *= -1
+        self.rect.x = x
+        self.change_x = change_x
+
 
 class Fly(Enemy):
     name = "FLY"
@@ -45,26 +97,42 @@ class Fly(Enemy):
 
         self.frames_left = []
         image = self.sprite_sheet.get_image(
-            FLY_WINGS_UP[0], FLY_WINGS_UP[1], FLY_WINGS_UP[2], FLY_WINGS_UP[3]
+            FLY_WINGS_UP[0],
+            FLY_WINGS_UP[1],
+            FLY_WINGS_UP[2],
+            FLY_WINGS_UP[3],
+            mask=True,
         )
         self.frames_left.append(image)
         image = self.sprite_sheet.get_image(
-            FLY_WINGS_DOWN[0], FLY_WINGS_DOWN[1], FLY_WINGS_DOWN[2], FLY_WINGS_DOWN[3]
+            FLY_WINGS_DOWN[0],
+            FLY_WINGS_DOWN[1],
+            FLY_WINGS_DOWN[2],
+            FLY_WINGS_DOWN[3],
+            mask=True,
         )
         self.frames_left.append(image)
 
         self.frames_right = []
 
         image = self.sprite_sheet.get_image(
-            FLY_WINGS_UP[0], FLY_WINGS_UP[1], FLY_WINGS_UP[2], FLY_WINGS_UP[3]
+            FLY_WINGS_UP[0],
+            FLY_WINGS_UP[1],
+            FLY_WINGS_UP[2],
+            FLY_WINGS_UP[3],
+            flipped=True,
+            mask=True,
         )
-        image = pygame.transform.flip(image, True, False)
         self.frames_right.append(image)
 
         image = self.sprite_sheet.get_image(
-            FLY_WINGS_DOWN[0], FLY_WINGS_DOWN[1], FLY_WINGS_DOWN[2], FLY_WINGS_DOWN[3]
+            FLY_WINGS_DOWN[0],
+            FLY_WINGS_DOWN[1],
+            FLY_WINGS_DOWN[2],
+            FLY_WINGS_DOWN[3],
+            flipped=True,
+            mask=True,
         )
-        image = pygame.transform.flip(image, True, False)
         self.frames_right.append(image)
 
         self.image = self.frames_right[0]
@@ -75,7 +143,7 @@ class Fly(Enemy):
         """Move the Fly."""
 
         if self.alive:
-            pos = self.rect.x - self.level.world_shift
+            pos = self.rect.x
             frame = (pos // 30) % 2  # 2 numbers of states
             if self.change_x < 1:
                 self.image = self.frames_left[frame]
@@ -83,21 +151,14 @@ class Fly(Enemy):
                 self.image = self.frames_right[frame]
 
             self.rect.x += self.change_x
-            hit = pygame.sprite.collide_rect(self, self.player)
-            if hit and not self.player.invincible:
-                if self.player.change_y > 0:
-                    self.alive = False
-                    self.time_killed = pygame.time.get_ticks()
-                    self.bounce_player()
-                    self.player.score += 10
-                else:
-                    self.player.hit()
+            if self.touches_player():
+                self.hit_player()
 
-            cur_pos = self.rect.x - self.level.world_shift
+            cur_pos = self.rect.x
             if cur_pos < self.boundary_left or cur_pos > self.boundary_right:
                 self.change_x *= -1
         else:
-            time_since_killed = pygame.time.get_ticks() - self.time_killed
+            time_since_killed = timing.get_ticks() - self.time_killed
             if time_since_killed < 700:
                 self.image = self.sprite_sheet.get_image(
                     FLY_DEAD[0], FLY_DEAD[1], FLY_DEAD[2], FLY_DEAD[3]
@@ -108,9 +169,7 @@ class Fly(Enemy):
 
     def bounce_player(self):
         self.player.rect.y += 2
-        platform_hit_list = pygame.sprite.spritecollide(
-            self.player, self.level.platform_list, False
-        )
+        platform_hit_list = self.level.platform_list.collide(self.player)
         self.player.rect.y -= 2
 
         # If it is ok to jump, set our speed upwards
@@ -133,26 +192,42 @@ class Slime(Enemy):
 
         self.frames_left = []
         image = self.sprite_sheet.get_image(
-            SLIME_WALK_1[0], SLIME_WALK_1[1], SLIME_WALK_1[2], SLIME_WALK_1[3]
+            SLIME_WALK_1[0],
+            SLIME_WALK_1[1],
+            SLIME_WALK_1[2],
+            SLIME_WALK_1[3],
+            mask=True,
         )
         self.frames_left.append(image)
         image = self.sprite_sheet.get_image(
-            SLIME_WALK_2[0], SLIME_WALK_2[1], SLIME_WALK_2[2], SLIME_WALK_2[3]
+            SLIME_WALK_2[0],
+            SLIME_WALK_2[1],
+            SLIME_WALK_2[2],
+            SLIME_WALK_2[3],
+            mask=True,
         )
         self.frames_left.append(image)
 
         self.frames_right = []
 
         image = self.sprite_sheet.get_image(
-            SLIME_WALK_1[0], SLIME_WALK_1[1], SLIME_WALK_1[2], SLIME_WALK_1[3]
+            SLIME_WALK_1[0],
+            SLIME_WALK_1[1],
+            SLIME_WALK_1[2],
+            SLIME_WALK_1[3],
+            flipped=True,
+            mask=True,
         )
-        image = pygame.transform.flip(image, True, False)
         self.frames_right.append(image)
 
         image = self.sprite_sheet.get_image(
-            SLIME_WALK_2[0], SLIME_WALK_2[1], SLIME_WALK_2[2], SLIME_WALK_2[3]
+            SLIME_WALK_2[0],
+            SLIME_WALK_2[1],
+            SLIME_WALK_2[2],
+            SLIME_WALK_2[3],
+            flipped=True,
+            mask=True,
         )
-        image = pygame.transform.flip(image, True, False)
         self.frames_right.append(image)
 
         self.image = self.frames_right[0]
@@ -163,7 +238,7 @@ class Slime(Enemy):
         """Move the Fly."""
 
         if self.alive:
-            pos = self.rect.x - self.level.world_shift
+            pos = self.rect.x
             frame = (pos // 30) % 2  # 2 numbers of states
             if self.change_x < 1:
                 self.image = self.frames_left[frame]
@@ -171,21 +246,14 @@ class Slime(Enemy):
                 self.image = self.frames_right[frame]
 
             self.rect.x += self.change_x
-            hit = pygame.sprite.collide_rect(self, self.player)
-            if hit and not self.player.invincible:
-                if self.player.change_y > 0:
-                    self.alive = False
-                    self.time_killed = pygame.time.get_ticks()
-                    self.bounce_player()
-                    self.player.score += 10
-                else:
-                    self.player.hit()
+            if self.touches_player():
+                self.hit_player()
 
-            cur_pos = self.rect.x - self.level.world_shift
+            cur_pos = self.rect.x
             if cur_pos < self.boundary_left or cur_pos > self.boundary_right:
                 self.change_x *= -1
         else:
-            time_since_killed = pygame.time.get_ticks() - self.time_killed
+            time_since_killed = timing.get_ticks() - self.time_killed
             if time_since_killed < 700:
                 self.rect.y += 10
             else:
@@ -193,9 +261,7 @@ class Slime(Enemy):
 
     def bounce_player(self):
         self.player.rect.y += 2
-        platform_hit_list = pygame.sprite.spritecollide(
-            self.player, self.level.platform_list, False
-        )
+        platform_hit_list = self.level.platform_list.collide(self.player)
         self.player.rect.y -= 2
 
         # If it is ok to jump, set our speed upwards
@@ -204,3 +270,208 @@ class Slime(Enemy):
             or self.player.rect.bottom >= constants.SCREEN_HEIGHT
         ):
             self.player.change_y = -5
+
+
+class EnemyGroup(pygame.sprite.Group):
+    """Sprite group for the enemies of a level, which only updates every
+    enemy every frame when it is near the camera.
+
+    Enemies further than margin pixels from the screen are far. They just
+    patrol, so rather than being updated they are moved on with
+    Enemy.advance every far_step frames, a few of them each frame. Before
+    an enemy is seen again it is brought up to where it would have been,
+    so the game plays out the same as updating everything.
+
+    Levels with at least batch_min enemies move them all every frame in an
+    EnemyBatch instead, if NumPy is installed."""
+
+    def __init__(self, camera, margin=None, far_step=None, batch_min=None):
+        pygame.sprite.Group.__init__(self)
+        self.camera = camera
+        self.margin = margin or constants.ENEMY_LOD_MARGIN
+        self.far_step = far_step or constants.ENEMY_LOD_STEP
+        self.batch_min = batch_min or constants.ENEMY_BATCH_MIN
+
+        self.frame = 0
+        self.view_x = None
+        # Order enemies were added in and the last frame each has been moved
+        # up to
+        self.order = {}
+        self.since = {}
+        self.next_order = 0
+
+        self.near = {}
+        self._near_sprites = None
+        # Far enemies, split by which frame of far_step they are moved on
+        self.far = [{} for _ in range(self.far_step)]
+
+        # Used instead of the near and far enemies when there are lots of
+        # them. Enemies that are dying aren't in the batch.
+        self.batch = None
+        self.dying = {}
+
+    def add_internal(self, sprite, *args):
+        pygame.sprite.Group.add_internal(self, sprite, *args)
+        if sprite in self.order:
+            return
+        self.order[sprite] = self.next_order
+        self.next_order += 1
+        # New enemies are updated next frame, and go far if they need to
+        self.since[sprite] = self.frame
+        self.near[sprite] = None
+        self._near_sprites = None
+        if self.batch is not None:
+            if sprite.alive:
+                self.batch.add(sprite)
+            else:
+                self.dying[sprite] = None
+
+    def remove_internal(self, sprite):
+        pygame.sprite.Group.remove_internal(self, sprite)
+        order = self.order.pop(sprite, None)
+        if order is None:
+            return
+        del self.since[sprite]
+        if self.batch is not None:
+            self.batch.remove(sprite)
+            self.dying.pop(sprite, None)
+        if sprite in self.near:
+            del self.near[sprite]
+            self._near_sprites = None
+        else:
+            self.far[order % self.far_step].pop(sprite, None)
+
+    def is_near(self, sprite, left, right):
+        return not sprite.alive or (
+            sprite.rect.right > left and sprite.rect.left < right
+        )
+
+    def catch_up(self, sprite, frame):
+        """Move a far enemy on to where it would be after frame."""
+        steps = frame - self.since[sprite]
+        if steps > 0:
+            sprite.advance(steps)
+            self.since[sprite] = frame
+
+    def sync(self):
+        """Bring every far enemy up to where it should be now."""
+        if self.batch is not None:
+            self.batch.write_back()
+        for far in self.far:
+            for sprite in far:
+                self.catch_up(sprite, self.frame)
+
+    def show(self, view):
+        """Make sure the rects of exactly the enemies in the view rect are
+        in it. Far and batched enemies are only given their positions near
+        the view they were updated with, and the camera may have moved or
+        jumped since."""
+        if self.batch is not None:
+            self.batch.show(view)
+        elif self.view_x is not None and abs(view.x - self.view_x) > self.margin // (
+            2 * self.far_step
+        ):
+            for far in self.far:
+                for sprite in far:
+                    self.catch_up(sprite, self.frame)
+
+    def restore(self, sprites, frame):
+        """Hold just sprites, in that order, as of frame, after their
+        positions have been set back to where they were then, see
+        snapshot.py. Every enemy starts off near, and the batch, if there
+        is one, is made again on the next update."""
+        self.batch = None
+        self.dying.clear()
+        if list(self.order) != list(sprites):
+            self.empty()
+            self.order.clear()
+            self.next_order = 0
+            self.add(*sprites)
+        self.frame = frame
+        self.view_x = None
+        for far in self.far:
+            far.clear()
+        self.near = dict.fromkeys(sorted(self.order, key=self.order.get))
+        self._near_sprites = None
+        for sprite in self.since:
+            self.since[sprite] = frame
+
+    def start_batch(self):
+        """Move every enemy into an EnemyBatch."""
+        self.sync()
+        for far in self.far:
+            for sprite in far:
+                self.near[sprite] = None
+            far.clear()
+        self._near_sprites = None
+
+        self.batch = enemybatch.EnemyBatch()
+        for sprite in sorted(self.order, key=self.order.get):
+            if sprite.alive:
+                self.batch.add(sprite)
+            else:
+                self.dying[sprite] = None
+
+    def stop_batch(self):
+        """Go back to updating enemies one at a time."""
+        self.batch.write_back()
+        self.batch = None
+        self.dying.clear()
+        for sprite in self.since:
+            self.since[sprite] = self.frame
+
+    def update_batch(self, *args):
+        self.frame += 1
+        for sprite in list(self.dying):
+            sprite.update(*args)
+        view = self.camera.view().inflate(self.margin * 2, 0)
+        for sprite in self.batch.step(view):
+            self.dying[sprite] = None
+
+    def update(self, *args):
+        if self.batch is None:
+            if enemybatch.available() and len(self.order) >= self.batch_min:
+                self.start_batch()
+        elif len(self.order) < self.batch_min // 2:
+            self.stop_batch()
+        if self.batch is not None:
+            self.update_batch(*args)
+            return
+
+        self.frame += 1
+        frame = self.frame
+        view = self.camera.view()
+        left = view.left - self.margin
+        right = view.right + self.margin
+
+        # The far enemies checked this frame. If the camera jumped they all
+        # are, as any of them may have come into view.
+        if self.view_x is None or abs(view.x - self.view_x) > self.margin // (
+            2 * self.far_step
+        ):
+            due = self.far
+        else:
+            due = [self.far[frame % self.far_step]]
+        self.view_x = view.x
+
+        for far in due:
+            for sprite in list(far):
+                self.catch_up(sprite, frame - 1)
+                if self.is_near(sprite, left, right):
+                    del far[sprite]
+                    self.near[sprite] = None
+                    self._near_sprites = None
+
+        if self._near_sprites is None:
+            self._near_sprites = sorted(self.near, key=self.order.get)
+        for sprite in self._near_sprites:
+            if sprite not in self.near:
+                # Killed by an enemy updated before it
+                continue
+            if not self.is_near(sprite, left, right):
+                del self.near[sprite]
+                self._near_sprites = None
+                self.far[self.order[sprite] % self.far_step][sprite] = None
+                continue
+            self.since[sprite] = frame
+            sprite.update(*args)
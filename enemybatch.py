@@ -0,0 +1,205 @@
+"""
+Module for moving large numbers of enemies at once with NumPy.
+
+NumPy is optional. If it isn't installed available() is False and levels
+update their enemies one at a time as usual.
+"""
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Enemy attributes kept in arrays, see EnemyBatch
+FIELDS = ("x", "y", "width", "height", "change_x", "left", "right")
+
+
+def available():
+    return numpy is not None
+
+
+class EnemyBatch(object):
+    """Patrolling enemies stored as one array per attribute, so a step of
+    all of them is a handful of array operations.
+
+    A step does the same as Fly.update and Slime.update: pick the walking
+    frame, move, check for the player and turn at the ends of the patrol.
+    Only the enemies whose rects touch the player are dealt with one at a
+    time, in the order they were added, so the result is exactly the same.
+
+    The arrays hold the real positions. Sprites are only given theirs when
+    they are on screen, or when write_back or show is called. Enemies that have
+    been killed are dropped from the batch, and finish dying in their own
+    update."""
+
+    def __init__(self):
+        self.sprites = []
+        self.index = {}
+        self.player = None
+        # Sprites added since the last step, put in the arrays on the next
+        self.pending = []
+        self.arrays = {name: numpy.zeros(0, dtype=numpy.int64) for name in FIELDS}
+        # Walking frame and direction picked in the last step, -1 if not
+        # stepped yet
+        self.frame = numpy.zeros(0, dtype=numpy.int64)
+        self.facing_right = numpy.zeros(0, dtype=bool)
+        # Sprites given their positions last step, and where the view was
+        self.shown = numpy.zeros(0, dtype=bool)
+        self.view = None
+        # The x each sprite was last given
+        self.written_x = numpy.zeros(0, dtype=numpy.int64)
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def __contains__(self, sprite):
+        return sprite in self.index
+
+    def add(self, sprite):
+        if sprite in self.index:
+            return
+        self.index[sprite] = len(self.sprites)
+        self.sprites.append(sprite)
+        self.pending.append(sprite)
+        self.player = sprite.player
+
+    def flush(self):
+        """Put the sprites added since the last step into the arrays."""
+        if not self.pending:
+            return
+        rows = [
+            (
+                sprite.rect.x,
+                sprite.rect.y,
+                sprite.rect.width,
+                sprite.rect.height,
+                sprite.change_x,
+                sprite.boundary_left,
+                sprite.boundary_right,
+            )
+            for sprite in self.pending
+        ]
+        columns = numpy.array(rows, dtype=numpy.int64).reshape(len(rows), len(FIELDS))
+        for i, name in enumerate(FIELDS):
+            self.arrays[name] = numpy.concatenate((self.arrays[name], columns[:, i]))
+        self.frame = numpy.concatenate(
+            (self.frame, numpy.full(len(rows), -1, dtype=numpy.int64))
+        )
+        self.facing_right = numpy.concatenate(
+            (self.facing_right, numpy.zeros(len(rows), dtype=bool))
+        )
+        self.shown = numpy.concatenate((self.shown, numpy.zeros(len(rows), dtype=bool)))
+        self.written_x = numpy.concatenate((self.written_x, columns[:, 0]))
+        self.pending = []
+
+    def remove(self, sprite):
+        """Drop a sprite from the batch, giving it its real position first."""
+        if sprite not in self.index:
+            return
+        self.flush()
+        i = self.index.pop(sprite)
+        self.write_back([i])
+        del self.sprites[i]
+        for name in FIELDS:
+            self.arrays[name] = numpy.delete(self.arrays[name], i)
+        self.frame = numpy.delete(self.frame, i)
+        self.facing_right = numpy.delete(self.facing_right, i)
+        self.shown = numpy.delete(self.shown, i)
+        self.written_x = numpy.delete(self.written_x, i)
+        for j in range(i, len(self.sprites)):
+            self.index[self.sprites[j]] = j
+
+    def write_back(self, indices=None):
+        """Give sprites their position, speed and image from the arrays.
+        Every sprite if no indices are given."""
+        self.flush()
+        if indices is None:
+            indices = range(len(self.sprites))
+        x = self.arrays["x"]
+        change_x = self.arrays["change_x"]
+        self.written_x[indices] = x[indices]
+        for i in indices:
+            i = int(i)
+            sprite = self.sprites[i]
+            sprite.rect.x = int(x[i])
+            sprite.change_x = int(change_x[i])
+            frame = int(self.frame[i])
+            if frame >= 0:
+                if self.facing_right[i]:
+                    sprite.image = sprite.frames_right[frame]
+                else:
+                    sprite.image = sprite.frames_left[frame]
+
+    def show(self, view):
+        """Give every sprite whose real position or the one it was last
+        given is in the view rect its real position, so that exactly the
+        sprites in the view have rects in it. The view may have moved since
+        the last step."""
+        self.flush()
+        x = self.arrays["x"]
+        written_x = self.written_x
+        width = self.arrays["width"]
+        stale = (x != written_x) & (
+            ((x < view.right) & (x + width > view.left))
+            | ((written_x < view.right) & (written_x + width > view.left))
+        )
+        if stale.any():
+            self.write_back(numpy.flatnonzero(stale))
+
+    def step(self, view):
+        """Move every enemy in the batch on by one frame and give the ones in
+        the view rect their new positions. Returns the enemies killed.
+
+        Sprites that were in the view last step are given their positions
+        too, so none are left drawn where they were on their way out of it.
+        If the view jumps by more than its width everything is."""
+        self.flush()
+        if not self.sprites:
+            return []
+        arrays = self.arrays
+        x = arrays["x"]
+        change_x = arrays["change_x"]
+
+        # Walking frame from where the enemy was before it moved
+        self.frame = (x // 30) % 2
+        self.facing_right = change_x >= 1
+
+        x += change_x
+
+        # Enemies whose rects touch the player, the same test as colliderect.
+        # Their pixels are only compared for these few, one at a time.
+        rect = self.player.rect
+        hits = numpy.flatnonzero(
+            (x < rect.right)
+            & (x + arrays["width"] > rect.left)
+            & (arrays["y"] < rect.bottom)
+            & (arrays["y"] + arrays["height"] > rect.top)
+        )
+
+        # Turn at the ends of the patrol
+        turn = (x < arrays["left"]) | (x > arrays["right"])
+        change_x[turn] *= -1
+
+        killed = []
+        if len(hits) and rect.width and rect.height:
+            for i in hits:
+                sprite = self.sprites[i]
+                self.write_back([i])
+                if not sprite.touches_player():
+                    continue
+                sprite.hit_player()
+                if not sprite.alive:
+                    killed.append(sprite)
+            for sprite in killed:
+                self.remove(sprite)
+
+        visible = (arrays["x"] < view.right) & (
+            arrays["x"] + arrays["width"] > view.left
+        )
+        if self.view is None or abs(view.x - self.view.x) > view.width:
+            self.write_back()
+        else:
+            self.write_back(numpy.flatnonzero(visible | self.shown))
+        self.shown = visible
+        self.view = view
+        return killed
@@ -0,0 +1,281 @@
+"""
+Module for letting programs play Homeward, for example to train agents.
+
+HomewardEnv wraps a headless Game in the usual reset/step interface. Each
+step the agent picks one of ACTION_SETS by its index, the game is moved on
+one frame with those actions held down, and the agent is given what it can
+see, a reward and whether the episode is over:
+
+    env = HomewardEnv(level_no=1)
+    observation = env.reset()
+    while True:
+        observation, reward, done, info = env.step(RIGHT_JUMP)
+        if done:
+            break
+
+An observation is a NumPy array describing the player, the HUD and the
+nearest enemies on screen, see observe. Given a pixel_size, the screen is
+drawn and shrunk to that size instead, and the observation is its pixels.
+
+VectorEnv runs many independent games in lockstep, taking an action for
+each and returning their observations stacked together. Run this module to
+see how many steps a second we manage:
+
+    python env.py --envs 16 --steps 20000
+    python env.py --envs 16 --steps 2000 --pixels 84 63
+"""
+import argparse
+import random
+import time
+
+import numpy
+import pygame
+
+import constants
+import game
+import simulation
+
+from render import FullRenderer
+
+# The actions held down for each action an agent can take, by index
+NOOP = 0
+LEFT = 1
+RIGHT = 2
+JUMP = 3
+LEFT_JUMP = 4
+RIGHT_JUMP = 5
+DUCK = 6
+ACTION_SETS = (
+    frozenset(),
+    frozenset((game.LEFT,)),
+    frozenset((game.RIGHT,)),
+    frozenset((game.JUMP,)),
+    frozenset((game.LEFT, game.JUMP)),
+    frozenset((game.RIGHT, game.JUMP)),
+    frozenset((game.DUCK,)),
+)
+
+# Rewards for going right, picking up points, and how the episode ended
+PROGRESS_REWARD = 0.01
+SCORE_REWARD = 0.1
+FINISH_REWARD = 10.0
+DEATH_REWARD = -10.0
+
+# Enemies described in an observation, nearest first
+NEAREST_ENEMIES = 4
+# Player x, y, change_x, change_y, health, score, progress, then whether
+# each enemy is there and how far away it is
+OBSERVATION_SIZE = 7 + NEAREST_ENEMIES * 3
+
+
+class HomewardEnv(object):
+    """One game of Homeward, played a level at a time. An episode ends when
+    the player leaves the level it started on, by finishing it or dying, or
+    after max_steps steps."""
+
+    action_count = len(ACTION_SETS)
+
+    def __init__(self, level_no=1, max_steps=3600, pixel_size=None, level_classes=None):
+        simulation.init_display()
+        self.level_no = level_no
+        self.max_steps = max_steps
+        self.pixel_size = pixel_size
+        self.level_classes = level_classes
+        self.game = None
+        self.steps = 0
+
+        if pixel_size is not None:
+            # Each game is drawn on its own surface, not the display
+            size = (constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT)
+            self.screen = pygame.Surface(size).convert()
+            self.renderer = FullRenderer(self.screen)
+            self.small_screen = pygame.Surface(pixel_size).convert()
+
+    @property
+    def observation_shape(self):
+        if self.pixel_size is None:
+            return (OBSERVATION_SIZE,)
+        width, height = self.pixel_size
+        return (height, width, 3)
+
+    def reset(self):
+        """Start a new game on level_no and return the first observation."""
+        self.game = game.Game(self.level_no, level_classes=self.level_classes)
+        self.steps = 0
+        return self.observe()
+
+    def step(self, action):
+        """Hold down the actions for action for one frame. Returns the
+        observation, reward, whether the episode is over and a dict of
+        extra information."""
+        current_game = self.game
+        player = current_game.player
+        x, y = player.rect.topleft
+        score = player.score
+
+        current_game.set_held(ACTION_SETS[action])
+        current_game.update()
+        self.steps += 1
+
+        reward = (player.score - score) * SCORE_REWARD
+        finished = died = False
+        if current_game.current_level_no == self.level_no:
+            # A player that falls off the bottom is put back at the top
+            # somewhere else, which isn't progress either way
+            respawned = player.rect.y < y - constants.SCREEN_HEIGHT
+            if not respawned:
+                reward += (player.rect.x - x) * PROGRESS_REWARD
+        elif player.health <= 0:
+            died = True
+            reward += DEATH_REWARD
+        else:
+            finished = True
+            reward += FINISH_REWARD
+        timed_out = self.steps >= self.max_steps
+
+        info = {
+            "steps": self.steps,
+            "health": player.health,
+            "score": player.score,
+            "finished": finished,
+            "died": died,
+            "timed_out": timed_out,
+        }
+        return self.observe(), reward, finished or died or timed_out, info
+
+    def observe(self):
+        if self.pixel_size is None:
+            return self.state()
+        return self.pixels()
+
+    def state(self):
+        """Return the player, HUD and nearest enemies as an array. Positions
+        are in screens, relative to the screen for the player and to the
+        player for enemies."""
+        current_game = self.game
+        player = current_game.player
+        level = current_game.current_level
+        camera = level.camera
+        observation = numpy.zeros(OBSERVATION_SIZE, numpy.float32)
+        observation[:7] = (
+            camera.to_screen_x(player.rect.x) / constants.SCREEN_WIDTH,
+            player.rect.y / constants.SCREEN_HEIGHT,
+            player.change_x,
+            player.change_y,
+            player.health / 100,
+            player.score,
+            camera.offset / level.level_limit if level.level_limit else 0.0,
+        )
+
+        # Enemies on screen are always up to date, see EnemyGroup
+        view = camera.view()
+        centre_x, centre_y = player.rect.center
+        enemies = [
+            (
+                (enemy.rect.centerx - centre_x) / constants.SCREEN_WIDTH,
+                (enemy.rect.centery - centre_y) / constants.SCREEN_HEIGHT,
+            )
+            for enemy in level.enemy_list
+            if view.colliderect(enemy.rect)
+        ]
+        enemies.sort(key=lambda offset: offset[0] ** 2 + offset[1] ** 2)
+        for i, (dx, dy) in enumerate(enemies[:NEAREST_ENEMIES]):
+            observation[7 + i * 3 : 10 + i * 3] = (1.0, dx, dy)
+        return observation
+
+    def pixels(self):
+        """Draw the game and return it shrunk to pixel_size, as an array of
+        rows of RGB pixels."""
+        current_game = self.game
+        self.renderer.draw(
+            current_game.current_level,
+            current_game.active_sprite_list,
+            current_game.huds,
+        )
+        pygame.transform.scale(self.screen, self.pixel_size, self.small_screen)
+        return pygame.surfarray.array3d(self.small_screen).transpose(1, 0, 2)
+
+
+class VectorEnv(object):
+    """Several HomewardEnvs stepped together. A game whose episode is over
+    is started again straight away, and the observation it ended on is kept
+    in its info as final_observation."""
+
+    action_count = HomewardEnv.action_count
+
+    def __init__(self, count, **env_args):
+        self.envs = [HomewardEnv(**env_args) for _ in range(count)]
+        shape = (count,) + self.envs[0].observation_shape
+        dtype = numpy.float32 if env_args.get("pixel_size") is None else numpy.uint8
+        self.observations = numpy.zeros(shape, dtype)
+        self.rewards = numpy.zeros(count, numpy.float32)
+        self.dones = numpy.zeros(count, bool)
+
+    def __len__(self):
+        return len(self.envs)
+
+    def reset(self):
+        """Start every game again. Returns their observations."""
+        for i, env in enumerate(self.envs):
+            self.observations[i] = env.reset()
+        return self.observations.copy()
+
+    def step(self, actions):
+        """Take one action in each game. Returns the observations, rewards
+        and whether each episode ended as arrays, and a list of infos."""
+        infos = []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            observation, reward, done, info = env.step(action)
+            if done:
+                info["final_observation"] = observation
+                observation = env.reset()
+            self.observations[i] = observation
+            self.rewards[i] = reward
+            self.dones[i] = done
+            infos.append(info)
+        return self.observations.copy(), self.rewards.copy(), self.dones.copy(), infos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time Homeward environments.")
+    parser.add_argument("--envs", type=int, default=16, help="games to run")
+    parser.add_argument("--steps", type=int, default=20000, help="steps in total")
+    parser.add_argument("--level", type=int, default=1, help="level to play")
+    parser.add_argument(
+        "--pixels",
+        type=int,
+        nargs=2,
+        metavar=("WIDTH", "HEIGHT"),
+        help="observe pixels",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed for the actions")
+    args = parser.parse_args()
+
+    envs = VectorEnv(
+        args.envs,
+        level_no=args.level,
+        pixel_size=tuple(args.pixels) if args.pixels else None,
+    )
+    rng = random.Random(args.seed)
+    envs.reset()
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(args.steps // len(envs)):
+        # Mostly go right, so the games get somewhere
+        actions = [
+            rng.choice((RIGHT, RIGHT_JUMP, RIGHT, rng.randrange(envs.action_count)))
+            for _ in range(len(envs))
+        ]
+        _, _, dones, _ = envs.step(actions)
+        episodes += int(dones.sum())
+    seconds = time.perf_counter() - start
+    steps = args.steps // len(envs) * len(envs)
+    print(
+        "{} steps of {} games in {:.2f}s ({:.0f} steps/s), {} episodes ended".format(
+            steps, len(envs), seconds, steps / seconds, episodes
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Module for the state of a game of Homeward and the rules that move it on
+from one frame to the next. Nothing in here draws to or reads from the
+display, so a Game can be run in a window or headless.
+"""
+import logging
+
+import pygame
+
+import constants
+import health
+import levels
+import score
+import timing
+
+from registry import LevelRegistry
+
+from player import Player
+from profiler import FrameProfiler
+
+logger = logging.getLogger(__name__)
+
+# Every level in the order they are played, the last one is shown when the
+# player dies
+LEVELS = [
+    levels.MainMenu,
+    levels.LevelTutorial,
+    levels.Level_01,
+    levels.Level_02,
+    levels.Level_03,
+    levels.Level_04,
+    levels.YouWin,
+    levels.GameOver,
+]
+
+# Things the player can do. Held actions are pressed and released in this order.
+LEFT = "left"
+RIGHT = "right"
+JUMP = "jump"
+DUCK = "duck"
+PREVIOUS_LEVEL = "previous_level"
+NEXT_LEVEL = "next_level"
+ACTIONS = (LEFT, RIGHT, JUMP, DUCK, PREVIOUS_LEVEL, NEXT_LEVEL)
+
+# Whether an action is started or stopped, see Game.queue
+PRESS = "press"
+RELEASE = "release"
+
+# Keys for each action
+LEFT_CONTROL_KEYS = [pygame.K_LEFT, pygame.K_a]
+RIGHT_CONTROL_KEYS = [pygame.K_d, pygame.K_RIGHT]
+UP_CONTROL_KEYS = [pygame.K_w, pygame.K_UP, pygame.K_SPACE]
+DOWN_CONTROL_KEYS = [pygame.K_DOWN, pygame.K_s]
+
+
+class Game(object):
+    """A game of Homeward: the player, the levels and the HUDs."""
+
+    def __init__(self, level_no=0, clock=None, level_classes=None):
+        # Everything in the game is timed by this, so the same input always
+        # plays out the same way
+        self.clock = clock or timing.SimulationClock()
+
+        # Create the player
+        self.player = Player()
+
+        # The levels are built as they are needed. The main menu and the
+        # screens at the end are small and visited often, so are kept.
+        self.level_list = LevelRegistry(
+            self.player, level_classes or LEVELS, pinned=(0, -2, -1)
+        )
+
+        # Set the current level
+        self.current_level_no = level_no
+        self.current_level = self.level_list.enter(level_no)
+
+        # HUD
+        self.game_HUD = health.HUD(self.player)
+        self.score_HUD = score.ScoreHUD(self.player)
+
+        self.active_sprite_list = pygame.sprite.Group()
+        self.player.change_level(self.current_level)
+
+        self.player.rect.x = 340
+        self.player.rect.y = constants.SCREEN_HEIGHT - self.player.rect.height - 25
+        self.active_sprite_list.add(self.player)
+
+        # Actions currently held down, see set_held
+        self.held = frozenset()
+
+        # Actions started and stopped since the last step, see queue
+        self.pending = []
+        # Given the input of each step if set, see replay.py
+        self.recorder = None
+
+        # Set when the user asks to quit
+        self.done = False
+
+        # Times each part of update, see profiler.py
+        self.profiler = FrameProfiler()
+
+    @property
+    def huds(self):
+        return [self.game_HUD, self.score_HUD]
+
+    def change_level(self, level_no):
+        self.current_level_no = level_no
+        self.current_level = self.level_list.enter(level_no)
+        self.player.change_level(self.current_level)
+
+    def handle_event(self, event):
+        """Turn a pygame event into the actions it stands for."""
+        if event.type == pygame.QUIT:  # If user clicked close
+            self.done = True  # Flag that we are done so we exit the game loop
+
+        if event.type == pygame.KEYDOWN:
+            if event.key in LEFT_CONTROL_KEYS:
+                self.queue(PRESS, LEFT)
+            if event.key in RIGHT_CONTROL_KEYS:
+                self.queue(PRESS, RIGHT)
+            if event.key in UP_CONTROL_KEYS:
+                self.queue(PRESS, JUMP)
+            if event.key in DOWN_CONTROL_KEYS:
+                self.queue(PRESS, DUCK)
+
+            if event.key == pygame.K_LEFT and pygame.key.get_mods() & pygame.KMOD_SHIFT:
+                self.queue(PRESS, PREVIOUS_LEVEL)
+            if (
+                event.key == pygame.K_RIGHT
+                and pygame.key.get_mods() & pygame.KMOD_SHIFT
+            ):
+                self.queue(PRESS, NEXT_LEVEL)
+
+        if event.type == pygame.KEYUP:
+            if event.key in LEFT_CONTROL_KEYS:
+                self.queue(RELEASE, LEFT)
+            if event.key in RIGHT_CONTROL_KEYS:
+                self.queue(RELEASE, RIGHT)
+            if event.key in DOWN_CONTROL_KEYS:
+                self.queue(RELEASE, DUCK)
+
+    def queue(self, kind, action):
+        """Start (PRESS) or stop (RELEASE) doing an action at the start of
+        the next step. All input goes through here so that it can be
+        recorded and replayed exactly."""
+        self.pending.append((kind, action))
+
+    def press(self, action):
+        """Start doing an action."""
+        player = self.player
+        if action == LEFT:
+            player.go_left()
+        elif action == RIGHT:
+            player.go_right()
+        elif action == JUMP:
+            player.jump()
+        elif action == DUCK:
+            player.duck()
+        elif action == PREVIOUS_LEVEL:
+            if self.current_level_no > 0:
+                self.change_level(self.current_level_no - 1)
+                player.rect.y = constants.SCREEN_HEIGHT - player.rect.height - 25
+        elif action == NEXT_LEVEL:
+            if self.current_level_no < len(self.level_list) - 1:
+                self.change_level(self.current_level_no + 1)
+                player.rect.y = constants.SCREEN_HEIGHT - player.rect.height - 25
+
+    def release(self, action):
+        """Stop doing an action."""
+        player = self.player
+        if action == LEFT and player.change_x < 0:
+            player.stop()
+        elif action == RIGHT and player.change_x > 0:
+            player.stop()
+        elif action == DUCK and player.change_y > 0:
+            player.stand_up()
+
+    def set_held(self, actions):
+        """Say which actions are held down next step. Actions that weren't
+        held last step are pressed and ones that no longer are released,
+        as if the keys for them had been pressed or let go."""
+        actions = frozenset(actions)
+        for action in ACTIONS:
+            if action in self.held and action not in actions:
+                self.queue(RELEASE, action)
+        for action in ACTIONS:
+            if action in actions and action not in self.held:
+                self.queue(PRESS, action)
+        self.held = actions
+
+    def update(self):
+        """Move the game on by one step."""
+        with timing.using(self.clock):
+            self.clock.advance()
+            self.handle_input()
+            self.step()
+
+    def handle_input(self):
+        """Do the actions queued since the last step."""
+        inputs = self.pending
+        self.pending = []
+        if self.recorder is not None:
+            self.recorder.record(inputs)
+        for kind, action in inputs:
+            if kind == PRESS:
+                self.press(action)
+            else:
+                self.release(action)
+
+    def step(self):
+        player = self.player
+        profiler = self.profiler
+
+        # Update the player.
+        with profiler.section("player"):
+            self.active_sprite_list.update()
+
+        # Update HUD
+        with profiler.section("health"):
+            self.game_HUD.update()
+        with profiler.section("score"):
+            self.score_HUD.update()
+
+        # Update items in the level
+        with profiler.section("level"):
+            self.current_level.update()
+
+        camera = self.current_level.camera
+        current_position = camera.to_screen_x(player.rect.x) + camera.offset
+
+        # Scroll the world if the player gets near either side of the screen
+        with profiler.section("scroll"):
+            camera.follow(player)
+
+        # If the player gets to the end of the level, go to the next level
+        if current_position < self.current_level.level_limit:
+            player.rect.x = camera.to_world_x(120)
+            if self.current_level_no < len(self.level_list) - 1:
+                self.change_level(self.current_level_no + 1)
+                logger.info("Level %s", self.current_level_no)
+                player.rect.y = constants.SCREEN_HEIGHT - player.rect.height - 25
+
+        if player.health <= 0:
+            self.change_level(len(self.level_list) - 1)
+            player.rect.y = constants.SCREEN_HEIGHT - player.rect.height - 40
+            player.rect.x = self.current_level.camera.to_world_x(
+                (constants.SCREEN_WIDTH / 2) - (player.rect.width / 2)
+            )
+            time_since_death = timing.get_ticks() - player.death_time
+            if time_since_death > 2000:
+                player.health = 100
+                self.change_level(0)
+                player.rect.y = constants.SCREEN_HEIGHT - player.rect.height - 40
+
+        # Enemies far away or in a batch may not have been given their
+        # positions in the view the camera has moved to
+        level = self.current_level
+        level.enemy_list.show(level.camera.view())
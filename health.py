@@ -1,3 +1,4 @@
+import logging
 import pygame
 import constants
 import math
@@ -5,10 +6,26 @@ import structures
 
 from spritesheet import SpriteSheet
 
+logger = logging.getLogger(__name__)
+
 HEART_EMPTY = (0, 47, 53, 45)
 HEART_FULL = (0, 94, 53, 45)
 HEART_HALF = (0, 0, 53, 45)
 
+# Pre-cut heart images shared by every Heart, keyed by the health they show
+_heart_glyphs = {}
+
+
+def heart_glyphs():
+    """Return the table of heart images, cutting them on first use."""
+    if not _heart_glyphs:
+        sprite_sheet = SpriteSheet("resources/hud_spritesheet.png")
+        for health, data in ((10, HEART_FULL), (5, HEART_HALF), (0, HEART_EMPTY)):
+            _heart_glyphs[health] = sprite_sheet.get_image(
+                data[0], data[1], data[2], data[3]
+            )
+    return _heart_glyphs
+
 
 class HUD:
     def __init__(self, player):
@@ -18,19 +35,12 @@ class HUD:
         self.health_bar()
 
     def update(self):
-        """Update everything in this level."""
-        self.health_draw_list.update()
-        if (
-            self.player.health < self.last_health
-            or self.player.health > self.last_health
-        ):
+        """Rebuild the health bar, but only if the player's health changed."""
+        if self.player.health != self.last_health:
             self.health_bar()
 
     def draw(self, screen):
-        for i, heart in enumerate(self.health_draw_list.sprites()):
-            heart.rect.y = 10
-            heart.rect.x = (i + 0.1) * 55
-        self.health_draw_list.draw(screen)
+        return self.health_draw_list.draw(screen)
 
     def health_bar(self):
         health = self.player.health
@@ -55,11 +65,13 @@ class HUD:
         for i in range((no_of_empty_hearts)):  # Display empty hearts
             self.hearts.append(Heart(0))
 
-        for heart in self.hearts:
+        for i, heart in enumerate(self.hearts):
+            heart.rect.y = 10
+            heart.rect.x = (i + 0.1) * 55
             self.health_draw_list.add(heart)
 
     def calculate_no_hearts(self, health):
-        print(health)
+        logger.info("Health: %s", health)
         if not health <= 0:
             no_of_hearts = health / 20
             hearts_tuple = math.modf(no_of_hearts)
@@ -98,25 +110,10 @@ class Heart(HUDItem):
     def __repr__(self):
         return "<Heart: {}>".format(self.health)
 
-    def update(self):
-        self.get_image()
-
     def get_image(self):
-        health = self.health
-        if health == 10:
-            self.image = self.sprite_sheet.get_image(
-                HEART_FULL[0], HEART_FULL[1], HEART_FULL[2], HEART_FULL[3]
-            )
-            self.rect = self.image.get_rect()
-        elif health == 5:
-            self.image = self.sprite_sheet.get_image(
-                HEART_HALF[0], HEART_HALF[1], HEART_HALF[2], HEART_HALF[3]
-            )
-            self.rect = self.image.get_rect()
-        elif health == 0:
-            self.image = self.sprite_sheet.get_image(
-                HEART_EMPTY[0], HEART_EMPTY[1], HEART_EMPTY[2], HEART_EMPTY[3]
-            )
+        image = heart_glyphs().get(self.health)
+        if image is not None:
+            self.image = image
             self.rect = self.image.get_rect()
         else:
-            print("Error in heart creation")
+            logger.error("No heart image for health %s", self.health)
@@ -6,18 +6,24 @@ http://opengameart.org/content/platformer-art-deluxe
 
 """
 
+import logging
+
 import pygame
 
 import constants
-import levels
-import health
-import score
+import render
+import snapshot
 
-from player import Player
+from game import Game
+from replay import Recorder
+from timestep import FixedTimestep, Interpolator
 
 
 def main():
     """Main Program"""
+    # Say what is happening in the console. Headless games don't set this
+    # up, so stay quiet.
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     pygame.init()
 
     # Set the height and width of the screen
@@ -26,157 +32,86 @@ def main():
 
     pygame.display.set_caption("Homeward")
 
-    # Create the player
-    player = Player()
-
-    # Create all the levels
-    level_list = []
-    level_list.append(levels.MainMenu(player))
-    level_list.append(levels.LevelTutorial(player))
-    level_list.append(levels.Level_01(player))
-    level_list.append(levels.Level_02(player))
-    level_list.append(levels.Level_03(player))
-    level_list.append(levels.Level_04(player))
-    level_list.append(levels.YouWin(player))
-    level_list.append(levels.GameOver(player))
-
-    # Set the current level
-    current_level_no = 0
-    current_level = level_list[current_level_no]
-
-    # HUD
-    game_HUD = health.HUD(player)
-    score_HUD = score.ScoreHUD(player)
+    # Create the player, the levels and the HUD
+    game = Game()
 
-    active_sprite_list = pygame.sprite.Group()
-    player.level = current_level
+    # Record the session so it can be played back, see replay.py
+    recorder = Recorder(game) if constants.RECORD_FILE else None
 
-    player.rect.x = 340
-    player.rect.y = constants.SCREEN_HEIGHT - player.rect.height - 25
-    active_sprite_list.add(player)
-
-    # Loop until the user clicks the close button.
-    done = False
+    if constants.DIRTY_RECT_RENDERING:
+        renderer = render.DirtyRenderer(screen)
+    else:
+        renderer = render.FullRenderer(screen)
 
     # Used to manage how fast the screen updates
     clock = pygame.time.Clock()
 
-    # -------- Main Program Loop -----------
-    while not done:
-        for event in pygame.event.get():  # User did something
-            if event.type == pygame.QUIT:  # If user clicked close
-                done = True  # Flag that we are done so we exit this loop
-
-            left_control_keys = [pygame.K_LEFT, pygame.K_a]
-            right_control_keys = [pygame.K_d, pygame.K_RIGHT]
-            up_control_keys = [pygame.K_w, pygame.K_UP, pygame.K_SPACE]
-            down_control_keys = [pygame.K_DOWN, pygame.K_s]
-
-            if event.type == pygame.KEYDOWN:
-                if event.key in left_control_keys:
-                    player.go_left()
-                if event.key in right_control_keys:
-                    player.go_right()
-                if event.key in up_control_keys:
-                    player.jump()
-                if event.key in down_control_keys:
-                    player.duck()
+    # The game is simulated in fixed steps, however fast we draw
+    timestep = FixedTimestep(constants.STEPS_PER_SECOND, constants.MAX_CATCH_UP_STEPS)
+    interpolator = Interpolator() if constants.INTERPOLATE else None
 
-                if (
-                    event.key == pygame.K_LEFT
-                    and pygame.key.get_mods() & pygame.KMOD_SHIFT
-                ):
-                    if current_level_no > 0:
-                        current_level_no -= 1
-                        current_level = level_list[current_level_no]
-                        player.level = current_level
-                        player.rect.y = (
-                            constants.SCREEN_HEIGHT - player.rect.height - 25
-                        )
+    # Press F3 to show how long each part of a frame takes
+    profiler = game.profiler
+
+    # Press F5 to quick save and F9 to go back to the quick save
+    quick_save = None
 
+    # -------- Main Program Loop -----------
+    # Loop until the user clicks the close button.
+    while not game.done:
+        with profiler.section("events"):
+            for event in pygame.event.get():  # User did something
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.toggle()
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                    quick_save = snapshot.take(game)
+                # A recording can't go back in time, so loading is off then
                 if (
-                    event.key == pygame.K_RIGHT
-                    and pygame.key.get_mods() & pygame.KMOD_SHIFT
+                    event.type == pygame.KEYDOWN
+                    and event.key == pygame.K_F9
+                    and quick_save is not None
+                    and recorder is None
                 ):
-                    if current_level_no < len(level_list) - 1:
-                        current_level_no += 1
-                        current_level = level_list[current_level_no]
-                        player.level = current_level
-                        player.rect.y = (
-                            constants.SCREEN_HEIGHT - player.rect.height - 25
-                        )
-
-            if event.type == pygame.KEYUP:
-                if event.key in left_control_keys and player.change_x < 0:
-                    player.stop()
-                if event.key in right_control_keys and player.change_x > 0:
-                    player.stop()
-                if event.key in down_control_keys and player.change_y > 0:
-                    player.stand_up()
-
-        # Update the player.
-        active_sprite_list.update()
-
-        # Update HUD
-        game_HUD.update()
-        score_HUD.update()
-
-        # Update items in the level
-        current_level.update()
-
-        current_position = player.rect.x + current_level.world_shift
-
-        # If the player gets near the right side, shift the world left (-x)
-        if player.rect.x >= 500:
-            diff = player.rect.x - 500
-            player.rect.x = 500
-            current_level.shift_world(-diff)
-
-        # If the player gets near the left side, shift the world right (+x)
-        if (
-            player.rect.x <= 120 and current_level.world_shift < -1
-        ):  # -1 to prevent edge of wall being seen
-            diff = 120 - player.rect.x
-            player.rect.x = 120
-            current_level.shift_world(diff)
-
-        # If the player gets to the end of the level, go to the next level
-        if current_position < current_level.level_limit:
-            player.rect.x = 120
-            if current_level_no < len(level_list) - 1:
-                current_level_no += 1
-                print(current_level_no)
-                current_level = level_list[current_level_no]
-                player.level = current_level
-                player.rect.y = constants.SCREEN_HEIGHT - player.rect.height - 25
-
-        if player.health <= 0:
-            current_level_no = len(level_list) - 1
-            current_level = level_list[current_level_no]
-            player.level = current_level
-            player.rect.y = constants.SCREEN_HEIGHT - player.rect.height - 40
-            player.rect.x = (constants.SCREEN_WIDTH / 2) - (player.rect.width / 2)
-            time_since_death = pygame.time.get_ticks() - player.death_time
-            if time_since_death > 2000:
-                player.health = 100
-                current_level_no = 0
-                current_level = level_list[current_level_no]
-                player.level = current_level
-                player.rect.y = constants.SCREEN_HEIGHT - player.rect.height - 40
+                    snapshot.restore(game, quick_save)
+                    if constants.DIRTY_RECT_RENDERING:
+                        renderer.invalidate()
+                game.handle_event(event)
+
+        # Run as many steps as it takes to catch up with the time since the
+        # last frame
+        steps = timestep.advance(clock.get_time() / 1000.0)
+        for step in range(steps):
+            if interpolator is not None and step == steps - 1:
+                interpolator.save(game)
+            game.update()
 
         # ALL CODE TO DRAW SHOULD GO BELOW THIS COMMENT
-        current_level.draw(screen)
-        active_sprite_list.draw(screen)
-        game_HUD.draw(screen)
-        score_HUD.draw(screen)
+        with profiler.section("draw"):
+            if interpolator is not None:
+                interpolator.apply(game, timestep.alpha)
+            huds = game.huds
+            if profiler.enabled and profiler.timings:
+                huds.append(profiler)
+            renderer.draw(game.current_level, game.active_sprite_list, huds)
+            if interpolator is not None:
+                interpolator.restore()
 
         # ALL CODE TO DRAW SHOULD GO ABOVE THIS COMMENT
 
-        # Limit to 60 frames per second
-        clock.tick(60)
+        # Limit how many frames are drawn a second
+        clock.tick(constants.MAX_FPS)
 
         # Go ahead and update the screen with what we've drawn.
-        pygame.display.flip()
+        with profiler.section("display"):
+            renderer.update_display()
+
+    if profiler.totals:
+        print(profiler.summary())
+
+    if recorder is not None:
+        recorder.stop().save(constants.RECORD_FILE)
+
+    game.level_list.shutdown()
 
     # Be IDLE friendly. If you forget this line, the program will 'hang'
     # on exit.
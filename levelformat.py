@@ -0,0 +1,398 @@
+"""
+Module for reading level files.
+
+Levels are described in JSON files in resources/levels:
+
+    {
+        "background": "resources/grass_background.png",
+        "level_limit": -2500,
+        "y_offset": 0,
+        "tiles": [["GRASS_LEFT", 770, 450], ...],
+        "floors": [["GRASS_MIDDLE", -5, 575, 1000], ...],
+        "moving_platforms": [
+            {"tile": "STONE_PLATFORM_MIDDLE", "x": 1350, "y": 300,
+             "change_x": 1, "boundary_left": 1350, "boundary_right": 1600},
+            {"tile": "STONE_PLATFORM_MIDDLE", "x": 2000, "y": 300,
+             "path": {"type": "circle", "centre": [2000, 200], "radius": 100,
+                      "period": 240}},
+            ...
+        ],
+        "enemies": [["FLY", 700, 250], ...]
+    }
+
+Tiles are named after the constants in structures.py and floors are
+expanded with Level.make_floor. y_offset, and any boundary or speed left
+out of a moving platform, default to 0. A moving platform with a path
+follows it instead of going back and forth, see movingplatforms.py.
+Positions, sizes, speeds and boundaries are whole numbers of pixels, except
+in paths, where speeds and the rest can be fractions.
+
+The first time a level file is read it is compiled into a packed binary
+file next to it, which later runs load straight into arrays without
+parsing any JSON. The compiled file is rebuilt whenever the JSON changes.
+
+Run this module to compile every level:
+
+    python levelformat.py
+"""
+import array
+import glob
+import json
+import os
+import struct
+import sys
+import tempfile
+
+from movingplatforms import CIRCLE, PATH_TYPES, WAYPOINTS
+
+LEVEL_DIRECTORY = "resources/levels"
+COMPILED_EXTENSION = ".hwl"
+
+MAGIC = b"HWLV"
+VERSION = 3
+
+# Magic, version, then the size and modification time of the JSON file the
+# compiled level was made from
+HEADER = struct.Struct("<4sHqq")
+
+MOVING_PLATFORM_FIELDS = (
+    "change_x",
+    "change_y",
+    "boundary_left",
+    "boundary_right",
+    "boundary_top",
+    "boundary_bottom",
+)
+
+# Levels already loaded, keyed by file name
+_levels = {}
+
+
+def whole(value, what):
+    """Return value as an int, or raise ValueError if it isn't a whole
+    number."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if not isinstance(value, int):
+        raise ValueError("{} must be a whole number, not {!r}".format(what, value))
+    return value
+
+
+def _whole_row(row, what):
+    """Return a row of a name followed by whole numbers, as a tuple."""
+    return (row[0],) + tuple(whole(value, what) for value in row[1:])
+
+
+def _number(value):
+    """Turn a number read back from a compiled path into an int if it is a
+    whole one, as it would have been in the level file."""
+    return int(value) if value.is_integer() else value
+
+
+def parse_path(path):
+    """Fill in the defaults of a moving platform's path."""
+    if path is None:
+        return None
+    if path["type"] == WAYPOINTS:
+        return {
+            "type": WAYPOINTS,
+            "speed": path["speed"],
+            "points": [tuple(point) for point in path["points"]],
+        }
+    if path["type"] == CIRCLE:
+        return {
+            "type": CIRCLE,
+            "centre": tuple(path["centre"]),
+            "radius": path["radius"],
+            "period": path["period"],
+            "start": path.get("start", 0),
+        }
+    raise ValueError("Unknown path type {!r}".format(path["type"]))
+
+
+def pack_path(path):
+    """Return a path as its type number and a list of numbers."""
+    if path is None:
+        return 0, []
+    if path["type"] == WAYPOINTS:
+        numbers = [path["speed"]]
+        for point in path["points"]:
+            numbers.extend(point)
+    else:
+        numbers = list(path["centre"]) + [
+            path["radius"],
+            path["period"],
+            path["start"],
+        ]
+    return PATH_TYPES.index(path["type"]) + 1, numbers
+
+
+def unpack_path(path_type, numbers):
+    """Turn the type number and numbers from pack_path back into a path."""
+    if path_type == 0:
+        return None
+    numbers = [_number(value) for value in numbers]
+    if PATH_TYPES[path_type - 1] == WAYPOINTS:
+        return {
+            "type": WAYPOINTS,
+            "speed": numbers[0],
+            "points": [tuple(numbers[i : i + 2]) for i in range(1, len(numbers), 2)],
+        }
+    return {
+        "type": CIRCLE,
+        "centre": tuple(numbers[0:2]),
+        "radius": numbers[2],
+        "period": numbers[3],
+        "start": numbers[4],
+    }
+
+
+def parse_level(text):
+    """Turn the text of a level file into level data. Raises ValueError if
+    it isn't valid."""
+    level = json.loads(text)
+    return {
+        "background": level["background"],
+        "level_limit": whole(level["level_limit"], "level_limit"),
+        "y_offset": whole(level.get("y_offset", 0), "y_offset"),
+        "tiles": [_whole_row(tile, "tile position") for tile in level.get("tiles", [])],
+        "floors": [
+            _whole_row(floor, "floor position and length")
+            for floor in level.get("floors", [])
+        ],
+        "moving_platforms": [
+            dict(
+                {
+                    field: whole(platform.get(field, 0), field)
+                    for field in MOVING_PLATFORM_FIELDS
+                },
+                tile=platform["tile"],
+                x=whole(platform["x"], "moving platform x"),
+                y=whole(platform["y"], "moving platform y"),
+                path=parse_path(platform.get("path")),
+            )
+            for platform in level.get("moving_platforms", [])
+        ],
+        "enemies": [
+            _whole_row(enemy, "enemy position") for enemy in level.get("enemies", [])
+        ],
+    }
+
+
+def _pack_string(string):
+    data = string.encode("utf-8")
+    return struct.pack("<H", len(data)) + data
+
+
+def _pack_ints(rows, typecode="i"):
+    """Pack rows of ints into a count followed by little-endian int32s, or
+    of other numbers as the array typecode says."""
+    values = array.array(typecode, [value for row in rows for value in row])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return struct.pack("<I", len(rows)) + values.tobytes()
+
+
+def compile_level(level, source_size=0, source_mtime=0):
+    """Pack level data into bytes. Names are stored once in a table and
+    every tile, floor, moving platform and enemy as a row of ints. The
+    numbers of the moving platforms' paths follow in one long list of
+    doubles, as they can be fractions."""
+    names = sorted(
+        set(tile[0] for tile in level["tiles"])
+        | set(floor[0] for floor in level["floors"])
+        | set(platform["tile"] for platform in level["moving_platforms"])
+        | set(enemy[0] for enemy in level["enemies"])
+    )
+    index = {name: i for i, name in enumerate(names)}
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION, source_size, source_mtime),
+        struct.pack("<ii", level["level_limit"], level["y_offset"]),
+        _pack_string(level["background"]),
+        struct.pack("<H", len(names)),
+    ]
+    parts.extend(_pack_string(name) for name in names)
+    parts.append(_pack_ints([(index[name], x, y) for name, x, y in level["tiles"]]))
+    parts.append(
+        _pack_ints(
+            [(index[name], x, y, length) for name, x, y, length in level["floors"]]
+        )
+    )
+    rows = []
+    path_numbers = []
+    for platform in level["moving_platforms"]:
+        path_type, numbers = pack_path(platform["path"])
+        rows.append(
+            [index[platform["tile"]], platform["x"], platform["y"]]
+            + [platform[field] for field in MOVING_PLATFORM_FIELDS]
+            + [path_type, len(numbers)]
+        )
+        path_numbers.extend((value,) for value in numbers)
+    parts.append(_pack_ints(rows))
+    parts.append(_pack_ints(path_numbers, "d"))
+    parts.append(_pack_ints([(index[name], x, y) for name, x, y in level["enemies"]]))
+    return b"".join(parts)
+
+
+class _Reader(object):
+    """Reads the parts of a compiled level in order."""
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, fmt):
+        values = struct.unpack_from(fmt, self.data, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return values
+
+    def string(self):
+        (length,) = self.unpack("<H")
+        string = bytes(self.data[self.offset : self.offset + length]).decode("utf-8")
+        self.offset += length
+        return string
+
+    def rows(self, width, typecode="i"):
+        (count,) = self.unpack("<I")
+        values = array.array(typecode)
+        end = self.offset + count * width * values.itemsize
+        values.frombytes(self.data[self.offset : end])
+        if sys.byteorder != "little":
+            values.byteswap()
+        self.offset = end
+        return [tuple(values[i : i + width]) for i in range(0, len(values), width)]
+
+
+def read_header(data):
+    """Return the version, source size and source modification time of a
+    compiled level, or None if data isn't a compiled level."""
+    if len(data) < HEADER.size:
+        return None
+    magic, version, source_size, source_mtime = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        return None
+    return version, source_size, source_mtime
+
+
+def read_compiled(data):
+    """Turn a compiled level back into level data."""
+    reader = _Reader(data)
+    reader.unpack(HEADER.format)
+    level_limit, y_offset = reader.unpack("<ii")
+    background = reader.string()
+    (name_count,) = reader.unpack("<H")
+    names = [reader.string() for _ in range(name_count)]
+
+    tiles = [(names[name], x, y) for name, x, y in reader.rows(3)]
+    floors = [(names[name], x, y, length) for name, x, y, length in reader.rows(4)]
+    moving_platforms = []
+    rows = reader.rows(5 + len(MOVING_PLATFORM_FIELDS))
+    path_numbers = [value for (value,) in reader.rows(1, "d")]
+    for row in rows:
+        platform = dict(zip(MOVING_PLATFORM_FIELDS, row[3:-2]))
+        path_type, length = row[-2:]
+        platform.update(
+            tile=names[row[0]],
+            x=row[1],
+            y=row[2],
+            path=unpack_path(path_type, path_numbers[:length]),
+        )
+        del path_numbers[:length]
+        moving_platforms.append(platform)
+    enemies = [(names[name], x, y) for name, x, y in reader.rows(3)]
+
+    return {
+        "background": background,
+        "level_limit": level_limit,
+        "y_offset": y_offset,
+        "tiles": tiles,
+        "floors": floors,
+        "moving_platforms": moving_platforms,
+        "enemies": enemies,
+    }
+
+
+def compiled_file_name(file_name):
+    return os.path.splitext(file_name)[0] + COMPILED_EXTENSION
+
+
+def write_compiled(compiled_name, data):
+    """Save a compiled level. It is written to a temporary file that then
+    replaces the old one, so anything reading it at the same time, such as
+    the preload thread or another process, never sees half of it."""
+    try:
+        handle, temp_name = tempfile.mkstemp(
+            suffix=COMPILED_EXTENSION, dir=os.path.dirname(compiled_name) or "."
+        )
+    except OSError:
+        # Not being able to cache the level isn't a problem
+        return
+    try:
+        with os.fdopen(handle, "wb") as compiled_file:
+            compiled_file.write(data)
+        os.replace(temp_name, compiled_name)
+    except OSError:
+        try:
+            os.remove(temp_name)
+        except OSError:
+            pass
+
+
+def load_level_data(file_name):
+    """Return the level data for a level file, using its compiled version
+    if it is up to date and compiling it if not. Levels are only read once
+    per run."""
+    level = _levels.get(file_name)
+    if level is not None:
+        return level
+
+    compiled_name = compiled_file_name(file_name)
+    try:
+        stat = os.stat(file_name)
+    except OSError:
+        # Only the compiled level has been shipped
+        stat = None
+
+    try:
+        with open(compiled_name, "rb") as compiled_file:
+            data = compiled_file.read()
+    except OSError:
+        data = b""
+
+    header = read_header(data)
+    if (
+        header is not None
+        and header[0] == VERSION
+        and (stat is None or header[1:] == (stat.st_size, stat.st_mtime_ns))
+    ):
+        try:
+            level = read_compiled(data)
+        except (struct.error, ValueError, IndexError):
+            # Cut short or otherwise broken, so read the level file instead
+            level = None
+
+    if level is None:
+        with open(file_name) as level_file:
+            level = parse_level(level_file.read())
+        write_compiled(
+            compiled_name, compile_level(level, stat.st_size, stat.st_mtime_ns)
+        )
+
+    _levels[file_name] = level
+    return level
+
+
+def main():
+    for file_name in sorted(glob.glob(os.path.join(LEVEL_DIRECTORY, "*.json"))):
+        _levels.pop(file_name, None)
+        try:
+            os.remove(compiled_file_name(file_name))
+        except OSError:
+            pass
+        load_level_data(file_name)
+        print("Compiled {}".format(file_name))
+
+
+if __name__ == "__main__":
+    main()
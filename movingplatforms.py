@@ -0,0 +1,173 @@
+"""
+Module for moving all the moving platforms of a level together.
+
+By default a moving platform goes back and forth between its boundaries.
+Platforms can also be given a path to follow, either a loop of waypoints
+or a circle. Paths are described in level files like this:
+
+    {"type": "waypoints", "speed": 2, "points": [[1400, 300], [1600, 200]]}
+    {"type": "circle", "centre": [1500, 300], "radius": 100, "period": 240}
+
+A platform on a waypoint path moves speed pixels a step towards the next
+point, going back to the first after the last. A platform on a circle
+path goes all the way round centre every period steps, starting start
+degrees round from the right. It is the top left of the platform that
+follows the path.
+"""
+import math
+
+import pygame
+
+# Kinds of path, in the order they are numbered in compiled levels
+WAYPOINTS = "waypoints"
+CIRCLE = "circle"
+PATH_TYPES = (WAYPOINTS, CIRCLE)
+
+
+class WaypointPath(object):
+    """Moves a platform round a loop of points at a steady speed."""
+
+    def __init__(self, points, speed):
+        self.points = [tuple(point) for point in points]
+        self.speed = speed
+        self.index = 0
+        # Exact position, as steps along a slope aren't whole pixels
+        self.position = None
+
+    def step(self, x, y):
+        """Return where a platform at x, y should be after one more step."""
+        if self.position is None or (
+            round(self.position[0]),
+            round(self.position[1]),
+        ) != (x, y):
+            self.position = (float(x), float(y))
+        position_x, position_y = self.position
+
+        distance_left = self.speed
+        # Passing more points than this in a step means they are all in the
+        # same place
+        for _ in range(len(self.points) + 1):
+            target_x, target_y = self.points[self.index]
+            distance = math.hypot(target_x - position_x, target_y - position_y)
+            if distance > distance_left:
+                position_x += (target_x - position_x) * distance_left / distance
+                position_y += (target_y - position_y) * distance_left / distance
+                break
+            position_x, position_y = target_x, target_y
+            distance_left -= distance
+            self.index = (self.index + 1) % len(self.points)
+
+        self.position = (position_x, position_y)
+        return round(position_x), round(position_y)
+
+
+class CirclePath(object):
+    """Moves a platform round a circle."""
+
+    def __init__(self, centre, radius, period, start=0):
+        self.centre = tuple(centre)
+        self.radius = radius
+        self.period = period
+        self.start = start
+        self.steps = 0
+
+    def step(self, x, y):
+        """Return where the platform should be after one more step."""
+        self.steps = (self.steps + 1) % self.period
+        angle = math.radians(self.start) + 2 * math.pi * self.steps / self.period
+        return (
+            round(self.centre[0] + self.radius * math.cos(angle)),
+            round(self.centre[1] + self.radius * math.sin(angle)),
+        )
+
+
+def make_path(spec):
+    """Return the path described by the path of a moving platform in level
+    data, or None to go back and forth."""
+    if spec is None:
+        return None
+    if spec["type"] == WAYPOINTS:
+        return WaypointPath(spec["points"], spec["speed"])
+    if spec["type"] == CIRCLE:
+        return CirclePath(
+            spec["centre"], spec["radius"], spec["period"], spec.get("start", 0)
+        )
+    raise ValueError("Unknown path type {!r}".format(spec["type"]))
+
+
+class MovingPlatformSystem(object):
+    """Moves a list of MovingPlatforms and shoves the player out of their
+    way, the same as calling update on each of them in turn.
+
+    Every platform is moved first. Then the player is checked once against
+    the areas all the platforms swept through, and only the platforms near
+    it work out whether they pushed it, in the order they were added.
+    Platforms following a path have change_x and change_y set to how far
+    they moved, so the player is carried along when stood on one."""
+
+    def __init__(self, platforms):
+        self.platforms = platforms
+
+    def update(self):
+        platforms = self.platforms
+        if not platforms:
+            return
+        player = platforms[0].player
+
+        # Move every platform, remembering the area it moved through
+        moves = []
+        for platform in platforms:
+            rect = platform.rect
+            if platform.path is None:
+                change_x = platform.change_x
+                change_y = platform.change_y
+            else:
+                x, y = platform.path.step(rect.x, rect.y)
+                change_x = platform.change_x = x - rect.x
+                change_y = platform.change_y = y - rect.y
+            start = rect.copy()
+            rect.x += change_x
+            rect.y += change_y
+            moves.append((platform, change_x, change_y, start.union(rect)))
+
+        if player is not None:
+            self.shove(player, moves)
+
+        # Turn back at the boundaries
+        for platform in platforms:
+            if platform.path is not None:
+                continue
+            rect = platform.rect
+            if (
+                rect.bottom > platform.boundary_bottom
+                or rect.top < platform.boundary_top
+            ):
+                platform.change_y *= -1
+            if rect.x < platform.boundary_left or rect.x > platform.boundary_right:
+                platform.change_x *= -1
+
+    def shove(self, player, moves):
+        """Push the player out of the way of any platform that moved into
+        it. Assumes it won't be pushed into anything else."""
+        player_rect = player.rect
+        # Far enough round the player to take in any platform that could
+        # still reach it after it has been pushed by another
+        swept = [move[3] for move in moves]
+        reach = max(max(rect.size) for rect in swept) + max(player_rect.size)
+        area = player_rect.inflate(reach * 2, reach * 2)
+        for i in area.collidelistall(swept):
+            platform, change_x, change_y, _ = moves[i]
+            rect = platform.rect
+
+            # Where the platform was after moving left/right
+            if player_rect.colliderect(rect.move(0, -change_y)):
+                if change_x < 0:
+                    player_rect.right = rect.left
+                else:
+                    player_rect.left = rect.right
+
+            if pygame.sprite.collide_rect(platform, player):
+                if change_y < 0:
+                    player_rect.bottom = rect.top
+                else:
+                    player_rect.top = rect.bottom
@@ -0,0 +1,255 @@
+"""
+Module for running lots of headless games at once, one per CPU core.
+
+Each run plays one level, from a recording, the demo script or random
+input, until the player leaves the level or a number of frames have gone
+by. Runs are shared out between a pool of processes, and what happened in
+each is added up per level:
+
+    python parallel.py --random 200 --frames 3600
+    python parallel.py --script --replays recordings/ --workers 8
+
+Recordings are looked for in the replays directory named after the level,
+as for benchmark.py.
+"""
+import argparse
+import concurrent.futures
+import os
+import random
+import time
+
+import game
+import simulation
+
+from benchmark import summarise
+from replay import Replay
+
+# Levels played, by default. The menus aren't worth playing.
+LEVEL_NUMBERS = range(1, 6)
+
+# Where the input for a run comes from
+REPLAY = "replay"
+SCRIPT = "script"
+RANDOM = "random"
+
+# How a run ended
+FINISHED = "finished"
+DIED = "died"
+TIMED_OUT = "timed_out"
+OUTCOMES = (FINISHED, DIED, TIMED_OUT)
+
+# Random input holds some actions for between these numbers of frames
+RANDOM_HOLD = (5, 40)
+# Random input is weighted to going right, or nothing would get finished
+RANDOM_ACTIONS = (
+    ((game.RIGHT,), 6),
+    ((game.RIGHT, game.JUMP), 3),
+    ((), 1),
+    ((game.LEFT,), 1),
+    ((game.LEFT, game.JUMP), 1),
+    ((game.JUMP,), 1),
+)
+
+
+def random_inputs(seed):
+    """Yield the set of actions held on each frame, chosen at random but the
+    same every time for the same seed."""
+    rng = random.Random(seed)
+    choices = [actions for actions, weight in RANDOM_ACTIONS for _ in range(weight)]
+    while True:
+        actions = frozenset(rng.choice(choices))
+        for _ in range(rng.randint(*RANDOM_HOLD)):
+            yield actions
+
+
+class Run(object):
+    """A level to play and where the input comes from: a recording file, the
+    demo script, or a random seed."""
+
+    def __init__(self, level_no, source, frames, seed=None, replay_file=None):
+        self.level_no = level_no
+        self.source = source
+        self.frames = frames
+        self.seed = seed
+        self.replay_file = replay_file
+
+
+def play(run):
+    """Play a run and return what happened."""
+    if run.source == REPLAY:
+        replay = Replay.load(run.replay_file)
+        sim = simulation.Simulation.from_replay(replay)
+        level_no = replay.level_no
+        inputs = replay.step_inputs()
+    else:
+        sim = simulation.Simulation(run.level_no)
+        level_no = run.level_no
+        if run.source == SCRIPT:
+            inputs = simulation.scripted_inputs(simulation.DEMO_SCRIPT, loop=True)
+        else:
+            inputs = random_inputs(run.seed)
+
+    current_game = sim.game
+    frame_times = []
+    for frame_input in inputs:
+        if len(frame_times) >= run.frames:
+            break
+        start = time.perf_counter()
+        if run.source == REPLAY:
+            for kind, action in frame_input:
+                current_game.queue(kind, action)
+            sim.step()
+        else:
+            sim.step(frame_input)
+        frame_times.append(time.perf_counter() - start)
+        if current_game.current_level_no != level_no:
+            break
+
+    if current_game.player.health <= 0:
+        outcome = DIED
+    elif current_game.current_level_no != level_no:
+        outcome = FINISHED
+    else:
+        outcome = TIMED_OUT
+    return {
+        "level": game.LEVELS[level_no].__name__,
+        "source": run.source,
+        "seed": run.seed,
+        "outcome": outcome,
+        "frames": len(frame_times),
+        "score": current_game.player.score,
+        "health": current_game.player.health,
+        "seconds": sum(frame_times),
+        "frame_ms": summarise(frame_times) if frame_times else None,
+    }
+
+
+def run_all(runs, workers=None):
+    """Play runs spread over workers processes, as many as there are cores
+    if None. Returns the result of each run, in order."""
+    runs = list(runs)
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        # Handing out a few runs at a time saves sending each one separately
+        chunk_size = max(1, len(runs) // ((workers or os.cpu_count() or 1) * 4))
+        return list(pool.map(play, runs, chunksize=chunk_size))
+
+
+def aggregate(results):
+    """Add up the results of runs for each level. Returns a dict from level
+    name to how many runs there were, how each ended, average score and
+    frames, and frame times."""
+    levels = {}
+    for result in results:
+        level = levels.setdefault(
+            result["level"],
+            {
+                "runs": 0,
+                FINISHED: 0,
+                DIED: 0,
+                TIMED_OUT: 0,
+                "score": 0,
+                "frames": 0,
+                "finish_frames": [],
+                "seconds": 0.0,
+                "p99_ms": 0.0,
+            },
+        )
+        level["runs"] += 1
+        level[result["outcome"]] += 1
+        level["score"] += result["score"]
+        level["frames"] += result["frames"]
+        level["seconds"] += result["seconds"]
+        if result["outcome"] == FINISHED:
+            level["finish_frames"].append(result["frames"])
+        if result["frame_ms"] is not None:
+            level["p99_ms"] = max(level["p99_ms"], result["frame_ms"]["p99"])
+
+    for level in levels.values():
+        finish_frames = level.pop("finish_frames")
+        level["completion"] = level[FINISHED] / level["runs"]
+        level["mean_score"] = level.pop("score") / level["runs"]
+        level["mean_finish_frames"] = (
+            sum(finish_frames) / len(finish_frames) if finish_frames else None
+        )
+        level["mean_ms"] = (
+            level["seconds"] / level["frames"] * 1000 if level["frames"] else 0.0
+        )
+    return levels
+
+
+def print_summary(levels):
+    print(
+        "{:<14} {:>5} {:>9} {:>5} {:>9} {:>7} {:>9} {:>8} {:>8}".format(
+            "level",
+            "runs",
+            "finished",
+            "died",
+            "timed out",
+            "score",
+            "frames",
+            "mean ms",
+            "p99 ms",
+        )
+    )
+    for name, level in levels.items():
+        finish_frames = level["mean_finish_frames"]
+        print(
+            "{:<14} {:>5} {:>9} {:>5} {:>9} {:>7.1f} {:>9} {:>8.3f} {:>8.3f}".format(
+                name,
+                level["runs"],
+                level[FINISHED],
+                level[DIED],
+                level[TIMED_OUT],
+                level["mean_score"],
+                "-" if finish_frames is None else "{:.0f}".format(finish_frames),
+                level["mean_ms"],
+                level["p99_ms"],
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play lots of Homeward at once.")
+    parser.add_argument("--workers", type=int, help="processes, one a core if unset")
+    parser.add_argument(
+        "--levels", type=int, nargs="+", default=list(LEVEL_NUMBERS), help="to play"
+    )
+    parser.add_argument("--frames", type=int, default=3600, help="most a run takes")
+    parser.add_argument("--random", type=int, default=0, help="random runs a level")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first run")
+    parser.add_argument("--script", action="store_true", help="play the demo script")
+    parser.add_argument("--replays", metavar="DIR", help="recordings to play")
+    args = parser.parse_args()
+
+    runs = []
+    for level_no in args.levels:
+        if args.replays:
+            name = game.LEVELS[level_no].__name__
+            replay_file = os.path.join(args.replays, name + ".hwr")
+            if os.path.exists(replay_file):
+                runs.append(Run(level_no, REPLAY, args.frames, replay_file=replay_file))
+        if args.script:
+            runs.append(Run(level_no, SCRIPT, args.frames))
+        runs.extend(
+            Run(level_no, RANDOM, args.frames, seed=args.seed + i)
+            for i in range(args.random)
+        )
+    if not runs:
+        parser.error("nothing to run, ask for --random, --script or --replays")
+
+    start = time.perf_counter()
+    results = run_all(runs, args.workers)
+    seconds = time.perf_counter() - start
+
+    levels = aggregate(results)
+    print_summary(levels)
+    played = sum(level["seconds"] for level in levels.values())
+    print(
+        "{} runs in {:.2f}s, {:.2f}s of play ({:.1f}x)".format(
+            len(runs), seconds, played, played / seconds
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
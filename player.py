@@ -2,13 +2,18 @@
 This module is used to hold the Player class. The Player represents the user-
 controlled sprite on the screen.
 """
+import logging
+
 import pygame
 
 import constants
+import timing
 
 from structures import MovingPlatform
 from spritesheet import SpriteSheet
 
+logger = logging.getLogger(__name__)
+
 
 class Player(pygame.sprite.Sprite):
     """This class represents the bar at the bottom that the player
@@ -19,11 +24,6 @@ class Player(pygame.sprite.Sprite):
     change_x = 0
     change_y = 0
 
-    # This holds all the images for the animated walk left/right
-    # of our player
-    walking_frames_l = []
-    walking_frames_r = []
-
     # What direction is the player facing?
     direction = "R"
 
@@ -37,45 +37,43 @@ class Player(pygame.sprite.Sprite):
         # Call the parent's constructor
         pygame.sprite.Sprite.__init__(self)
 
+        # This holds all the images for the animated walk left/right
+        # of our player
+        self.walking_frames_l = []
+        self.walking_frames_r = []
+
         sprite_sheet = SpriteSheet("resources/p1_walk.png")
         # Load all the right facing images into a list
-        image = sprite_sheet.get_image(0, 0, 66, 90)
+        image = sprite_sheet.get_image(0, 0, 66, 90, mask=True)
         self.walking_frames_r.append(image)
-        image = sprite_sheet.get_image(66, 0, 66, 90)
+        image = sprite_sheet.get_image(66, 0, 66, 90, mask=True)
         self.walking_frames_r.append(image)
-        image = sprite_sheet.get_image(132, 0, 67, 90)
+        image = sprite_sheet.get_image(132, 0, 67, 90, mask=True)
         self.walking_frames_r.append(image)
-        image = sprite_sheet.get_image(0, 93, 66, 90)
+        image = sprite_sheet.get_image(0, 93, 66, 90, mask=True)
         self.walking_frames_r.append(image)
-        image = sprite_sheet.get_image(66, 93, 66, 90)
+        image = sprite_sheet.get_image(66, 93, 66, 90, mask=True)
         self.walking_frames_r.append(image)
-        image = sprite_sheet.get_image(132, 93, 72, 90)
+        image = sprite_sheet.get_image(132, 93, 72, 90, mask=True)
         self.walking_frames_r.append(image)
-        image = sprite_sheet.get_image(0, 186, 70, 90)
+        image = sprite_sheet.get_image(0, 186, 70, 90, mask=True)
         self.walking_frames_r.append(image)
 
-        # Load all the right facing images, then flip them
+        # Load all the right facing images again, flipped
         # to face left.
-        image = sprite_sheet.get_image(0, 0, 66, 90)
-        image = pygame.transform.flip(image, True, False)
+        image = sprite_sheet.get_image(0, 0, 66, 90, flipped=True, mask=True)
         self.walking_frames_l.append(image)
-        image = sprite_sheet.get_image(66, 0, 66, 90)
-        image = pygame.transform.flip(image, True, False)
+        image = sprite_sheet.get_image(66, 0, 66, 90, flipped=True, mask=True)
         self.walking_frames_l.append(image)
-        image = sprite_sheet.get_image(132, 0, 67, 90)
-        image = pygame.transform.flip(image, True, False)
+        image = sprite_sheet.get_image(132, 0, 67, 90, flipped=True, mask=True)
         self.walking_frames_l.append(image)
-        image = sprite_sheet.get_image(0, 93, 66, 90)
-        image = pygame.transform.flip(image, True, False)
+        image = sprite_sheet.get_image(0, 93, 66, 90, flipped=True, mask=True)
         self.walking_frames_l.append(image)
-        image = sprite_sheet.get_image(66, 93, 66, 90)
-        image = pygame.transform.flip(image, True, False)
+        image = sprite_sheet.get_image(66, 93, 66, 90, flipped=True, mask=True)
         self.walking_frames_l.append(image)
-        image = sprite_sheet.get_image(132, 93, 72, 90)
-        image = pygame.transform.flip(image, True, False)
+        image = sprite_sheet.get_image(132, 93, 72, 90, flipped=True, mask=True)
         self.walking_frames_l.append(image)
-        image = sprite_sheet.get_image(0, 186, 70, 90)
-        image = pygame.transform.flip(image, True, False)
+        image = sprite_sheet.get_image(0, 186, 70, 90, flipped=True, mask=True)
         self.walking_frames_l.append(image)
 
         # Set the image the player starts with
@@ -91,7 +89,7 @@ class Player(pygame.sprite.Sprite):
     def update(self):
         """Move the player."""
         # Gravity
-        self.pos = self.rect.x + self.level.world_shift
+        self.pos = self.rect.x
         self.calc_grav()
 
         # Move left/right
@@ -105,14 +103,12 @@ class Player(pygame.sprite.Sprite):
             self.image = self.walking_frames_l[frame]
 
         if self.invincible:
-            time_since_last_hit = pygame.time.get_ticks() - self.last_hit
+            time_since_last_hit = timing.get_ticks() - self.last_hit
             if time_since_last_hit > 3000:
                 self.invincible = False
 
-        # See if we hit anything
-        block_hit_list = pygame.sprite.spritecollide(
-            self, self.level.platform_list, False
-        )
+        # See if we hit anything, tile by tile
+        block_hit_list = self.level.platform_list.collide_tiles(self)
         for block in block_hit_list:
             # If we are moving right,
             # set our right side to the left side of the item we hit
@@ -126,9 +122,7 @@ class Player(pygame.sprite.Sprite):
         self.rect.y += self.change_y
 
         # Check and see if we hit anything
-        block_hit_list = pygame.sprite.spritecollide(
-            self, self.level.platform_list, False
-        )
+        block_hit_list = self.level.platform_list.collide(self)
         for block in block_hit_list:
             # Reset our position based on the top/bottom of the object.
             if self.change_y > 0:
@@ -155,14 +149,14 @@ class Player(pygame.sprite.Sprite):
             and self.change_y >= 0
         ):
             self.change_y = 0
-            self.rect.x = 340
+            self.rect.x = self.level.camera.to_world_x(340)
             self.rect.y = 0
             self.health -= 20
             self.invincible = True
-            self.last_hit = pygame.time.get_ticks()
+            self.last_hit = timing.get_ticks()
             if self.health <= 0:
-                self.death_time = pygame.time.get_ticks()
-            print("Fallen")
+                self.death_time = timing.get_ticks()
+            logger.info("Fallen")
 
     def jump(self):
         """Called when user hits 'jump' button."""
@@ -171,15 +165,21 @@ class Player(pygame.sprite.Sprite):
         # Move down 2 pixels because it doesn't work well if we only move down 1
         # when working with a platform moving down.
         self.rect.y += 2
-        platform_hit_list = pygame.sprite.spritecollide(
-            self, self.level.platform_list, False
-        )
+        platform_hit_list = self.level.platform_list.collide(self)
         self.rect.y -= 2
 
         # If it is ok to jump, set our speed upwards
         if len(platform_hit_list) > 0 or self.rect.bottom >= constants.SCREEN_HEIGHT:
             self.change_y = -11
 
+    def change_level(self, level):
+        """Move the player to another level, keeping them at the same place
+        on the screen."""
+        if self.level is not None:
+            screen_x = self.level.camera.to_screen_x(self.rect.x)
+            self.rect.x = level.camera.to_world_x(screen_x)
+        self.level = level
+
     # Player-controlled movement:
     def go_left(self):
         """Called when the user hits the left arrow."""
@@ -204,7 +204,7 @@ class Player(pygame.sprite.Sprite):
     def hit(self):
         self.health -= 10
         self.invincible = True
-        self.last_hit = pygame.time.get_ticks()
+        self.last_hit = timing.get_ticks()
         if self.health <= 0:
-            self.death_time = pygame.time.get_ticks()
-        print("Player Hit")
+            self.death_time = timing.get_ticks()
+        logger.info("Player Hit")
@@ -0,0 +1,127 @@
+"""
+Module for timing where each frame's time goes.
+
+Code to be timed is wrapped in a section:
+
+    with profiler.section("draw"):
+        ...
+
+While the profiler is disabled a section does nothing, so it can be left
+in the game loop.
+"""
+import collections
+import time
+
+import pygame
+
+import constants
+
+
+class _NullSection(object):
+    """Section used while the profiler is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class _Section(object):
+    """Times the code run inside it and hands the time to the profiler."""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class FrameProfiler(object):
+    """Keeps rolling timings for each section of the game loop, plus totals
+    for the whole session."""
+
+    def __init__(self, enabled=False, window=120):
+        self.enabled = enabled
+        # Number of recent timings min, mean and p99 are worked out over
+        self.window = window
+        self.timings = collections.OrderedDict()
+        # name -> [count, total, min, max] for the whole session
+        self.totals = collections.OrderedDict()
+        self.font = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+
+    def section(self, name):
+        if not self.enabled:
+            return _NULL_SECTION
+        return _Section(self, name)
+
+    def record(self, name, seconds):
+        timings = self.timings.get(name)
+        if timings is None:
+            timings = self.timings[name] = collections.deque(maxlen=self.window)
+            self.totals[name] = [0, 0.0, seconds, seconds]
+        timings.append(seconds)
+
+        totals = self.totals[name]
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] = min(totals[2], seconds)
+        totals[3] = max(totals[3], seconds)
+
+    def stats(self, name):
+        """Return the min, mean and 99th percentile of the recent timings
+        for a section, in seconds."""
+        timings = sorted(self.timings[name])
+        p99 = timings[int(0.99 * (len(timings) - 1))]
+        return timings[0], sum(timings) / len(timings), p99
+
+    def summary(self):
+        """Return a table of the timings for the whole session."""
+        lines = [
+            "{:<10} {:>8} {:>9} {:>9} {:>9}".format(
+                "section", "calls", "min ms", "mean ms", "max ms"
+            )
+        ]
+        for name, (count, total, low, high) in self.totals.items():
+            lines.append(
+                "{:<10} {:>8} {:>9.3f} {:>9.3f} {:>9.3f}".format(
+                    name, count, low * 1000, total / count * 1000, high * 1000
+                )
+            )
+        return "\n".join(lines)
+
+    def draw(self, screen):
+        """Draw the recent timings over the top of the game. Returns the area
+        of the screen drawn on."""
+        if self.font is None:
+            self.font = pygame.font.SysFont("couriernew,monospace", 14)
+
+        lines = ["section     min   mean    p99 (ms)"]
+        for name in self.timings:
+            low, mean, p99 = self.stats(name)
+            lines.append(
+                "{:<9} {:>6.2f} {:>6.2f} {:>6.2f}".format(
+                    name, low * 1000, mean * 1000, p99 * 1000
+                )
+            )
+
+        line_height = self.font.get_linesize()
+        area = pygame.Rect(10, 70, 250, line_height * len(lines) + 10)
+        screen.fill(constants.BLACK, area)
+        for i, line in enumerate(lines):
+            text = self.font.render(line, True, constants.WHITE)
+            screen.blit(text, (area.x + 5, area.y + 5 + i * line_height))
+        return [area]
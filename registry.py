@@ -0,0 +1,99 @@
+"""
+Module for building levels only when they are needed.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import spritesheet
+
+
+class LevelRegistry(object):
+    """Holds the levels of a game, building each one the first time it is
+    entered rather than all of them up front.
+
+    While a level is played the next one's level file is read and its
+    background image decoded on a background thread. The level itself is
+    still built when it is entered, but that no longer has to wait on the
+    disk or on decoding the image. Levels more than release_distance behind
+    the one being played are forgotten to save memory. Their camera offset
+    is kept, so a level the player has already got through is still passed
+    straight through if they come back to it after dying. Pinned levels,
+    such as the menus, are never released and entering them doesn't count
+    as moving on."""
+
+    def __init__(self, player, level_classes, pinned=(), release_distance=2):
+        self.player = player
+        self.level_classes = list(level_classes)
+        self.pinned = set(level_no % len(self.level_classes) for level_no in pinned)
+        self.release_distance = release_distance
+
+        self.levels = {}
+        self.offsets = {}
+        self.preloads = {}
+        self.executor = None
+
+    def __len__(self):
+        return len(self.level_classes)
+
+    def __getitem__(self, level_no):
+        return self.get(level_no)
+
+    def is_built(self, level_no):
+        return level_no in self.levels
+
+    def get(self, level_no):
+        """Return a level, building it if need be."""
+        level = self.levels.get(level_no)
+        if level is None:
+            preload = self.preloads.pop(level_no, None)
+            if preload is not None:
+                # Wait for the images rather than decoding them twice
+                preload.result()
+
+            level = self.level_classes[level_no](self.player)
+            if level_no in self.offsets:
+                level.camera.offset = self.offsets.pop(level_no)
+                level.stream()
+            self.levels[level_no] = level
+        return level
+
+    def enter(self, level_no):
+        """Return a level that is about to be played, getting the next one
+        ready and releasing ones left far behind."""
+        level = self.get(level_no)
+        if level_no not in self.pinned:
+            if level_no + 1 < len(self):
+                self.preload(level_no + 1)
+            for old_level_no in list(self.levels):
+                if old_level_no < level_no - self.release_distance:
+                    self.release(old_level_no)
+        return level
+
+    def preload(self, level_no):
+        """Start reading a level's file and decoding its background image in
+        the background, see Level.preload."""
+        if level_no in self.levels or level_no in self.preloads:
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        self.preloads[level_no] = self.executor.submit(
+            self.level_classes[level_no].preload
+        )
+
+    def release(self, level_no):
+        """Forget a level, and its background if no other level uses it."""
+        if level_no in self.pinned or level_no not in self.levels:
+            return
+        level = self.levels.pop(level_no)
+        self.offsets[level_no] = level.camera.offset
+
+        file_name = level.background_file
+        if not any(
+            other.background_file == file_name for other in self.levels.values()
+        ):
+            spritesheet.unload_image(file_name)
+
+    def shutdown(self):
+        """Stop the background thread."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
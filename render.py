@@ -0,0 +1,88 @@
+"""
+Module for getting each frame onto the display.
+"""
+import pygame
+
+
+class FullRenderer(object):
+    """Redraws the whole screen every frame and flips the display."""
+
+    def __init__(self, screen):
+        self.screen = screen
+
+    def draw(self, level, sprites, huds):
+        """Draw the level, the sprites that aren't part of it and the HUDs."""
+        level.draw(self.screen)
+        level.camera.draw(self.screen, sprites)
+        for hud in huds:
+            hud.draw(self.screen)
+
+    def update_display(self):
+        pygame.display.flip()
+
+
+class DirtyRenderer(object):
+    """Only redraws and updates the parts of the screen that changed.
+
+    The level's background and static platforms are drawn once into an
+    off-screen backdrop. Each frame the areas covered by sprites on the
+    previous frame are restored from the backdrop, the sprites are drawn
+    again, and only those areas are sent to the display. When the camera
+    scrolls or the level changes the backdrop is out of date, so the whole
+    screen is redrawn and flipped instead."""
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.backdrop = pygame.Surface(screen.get_size()).convert()
+        self.backdrop_ready = False
+
+        # What the screen was last fully drawn for
+        self.level = None
+        self.offset = None
+
+        # Areas drawn on by sprites last frame, and ones to update this frame
+        self.last_rects = []
+        self.dirty_rects = None
+
+    def invalidate(self):
+        """Force the next frame to be fully redrawn."""
+        self.level = None
+
+    def draw_sprites(self, level, sprites, huds):
+        rects = level.draw_sprites(self.screen)
+        rects.extend(level.camera.draw(self.screen, sprites))
+        for hud in huds:
+            rects.extend(hud.draw(self.screen))
+        return rects
+
+    def draw(self, level, sprites, huds):
+        """Draw the level, the sprites that aren't part of it and the HUDs."""
+        screen = self.screen
+
+        if level is not self.level or level.camera.offset != self.offset:
+            # The world has moved, so everything has to be redrawn
+            self.level = level
+            self.offset = level.camera.offset
+            self.backdrop_ready = False
+            level.draw_background(screen)
+            self.last_rects = self.draw_sprites(level, sprites, huds)
+            self.dirty_rects = None
+            return
+
+        if not self.backdrop_ready:
+            level.draw_background(self.backdrop)
+            self.backdrop_ready = True
+
+        # Rub out last frame's sprites, then draw this frame's
+        for rect in self.last_rects:
+            screen.blit(self.backdrop, rect, rect)
+        rects = self.draw_sprites(level, sprites, huds)
+
+        self.dirty_rects = self.last_rects + rects
+        self.last_rects = rects
+
+    def update_display(self):
+        if self.dirty_rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.dirty_rects)
@@ -0,0 +1,168 @@
+"""
+Module for recording the input of a game and playing it back.
+
+A recording is the level the game started on and every action pressed or
+released, along with the step it happened before. A Game times everything
+by counting steps, so playing a recording back gives exactly the same game
+as the one recorded. Recordings can be used to check that a change hasn't
+altered how the game plays, and to time the game under the same load on
+every run.
+
+Recordings are saved as a header followed by one entry per input:
+
+    magic, version, level, steps per second, steps, inputs, state digest
+    step, action
+
+where action is the index of the action in ACTIONS, doubled, plus one
+if it was released.
+"""
+import struct
+import zlib
+
+import timing
+
+from game import ACTIONS, PRESS, RELEASE, Game
+
+MAGIC = b"HWRP"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHHHIII")
+INPUT = struct.Struct("<IB")
+
+
+def state_digest(game):
+    """Return a checksum of where everything in a game is, used to check a
+    replay ends up the same as the game it was recorded from."""
+    player = game.player
+    level = game.current_level
+    state = [
+        game.current_level_no,
+        tuple(player.rect),
+        player.change_x,
+        player.change_y,
+        player.health,
+        player.score,
+        level.camera.offset,
+    ]
+    level.enemy_list.sync()
+    state.extend(tuple(enemy.rect) for enemy in level.enemy_list)
+    state.extend(tuple(platform.rect) for platform in level.platform_list.moving)
+    return zlib.crc32(repr(state).encode("utf-8"))
+
+
+def encode(kind, action):
+    return ACTIONS.index(action) * 2 + (kind == RELEASE)
+
+
+def decode(code):
+    kind = RELEASE if code % 2 else PRESS
+    return kind, ACTIONS[code // 2]
+
+
+class Replay(object):
+    """The input of a recorded game."""
+
+    def __init__(self, level_no=0, step_rate=None, steps=0, inputs=(), digest=0):
+        self.level_no = level_no
+        self.step_rate = step_rate or timing.SimulationClock().step_rate
+        self.steps = steps
+        # (step, code) pairs, see encode
+        self.inputs = list(inputs)
+        self.digest = digest
+
+    def step_inputs(self):
+        """Yield the list of (kind, action) inputs for each step."""
+        inputs = iter(self.inputs)
+        pending = next(inputs, None)
+        for step in range(self.steps):
+            step_inputs = []
+            while pending is not None and pending[0] == step:
+                step_inputs.append(decode(pending[1]))
+                pending = next(inputs, None)
+            yield step_inputs
+
+    def new_game(self):
+        """Return a game set up the same as the recorded one was."""
+        return Game(self.level_no, timing.SimulationClock(self.step_rate))
+
+    def play(self, game=None):
+        """Play the recording through a game, a new one if none is given.
+        Returns the game."""
+        if game is None:
+            game = self.new_game()
+        for step_inputs in self.step_inputs():
+            for kind, action in step_inputs:
+                game.queue(kind, action)
+            game.update()
+        return game
+
+    def matches(self, game):
+        """Return whether a game has ended up where the recording did."""
+        return state_digest(game) == self.digest
+
+    def to_bytes(self):
+        parts = [
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                self.level_no,
+                self.step_rate,
+                self.steps,
+                len(self.inputs),
+                self.digest,
+            )
+        ]
+        parts.extend(INPUT.pack(step, code) for step, code in self.inputs)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, level_no, step_rate, steps, count, digest = HEADER.unpack_from(
+            data
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a version {} recording".format(VERSION))
+        inputs = [
+            INPUT.unpack_from(data, HEADER.size + i * INPUT.size) for i in range(count)
+        ]
+        return cls(level_no, step_rate, steps, inputs, digest)
+
+    def save(self, file_name):
+        with open(file_name, "wb") as replay_file:
+            replay_file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, file_name):
+        with open(file_name, "rb") as replay_file:
+            return cls.from_bytes(replay_file.read())
+
+
+class Recorder(object):
+    """Records the input of a game. Start it before the game's first step,
+    as a replay starts from a new game."""
+
+    def __init__(self, game):
+        self.game = game
+        self.level_no = game.current_level_no
+        self.step_rate = game.clock.step_rate
+        self.steps = 0
+        self.inputs = []
+        game.recorder = self
+
+    def record(self, inputs):
+        """Called by the game with the input of each step."""
+        for kind, action in inputs:
+            self.inputs.append((self.steps, encode(kind, action)))
+        self.steps += 1
+
+    def stop(self):
+        """Stop recording and return the recording."""
+        if self.game.recorder is self:
+            self.game.recorder = None
+        return Replay(
+            self.level_no,
+            self.step_rate,
+            self.steps,
+            self.inputs,
+            state_digest(self.game),
+        )
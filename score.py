@@ -1,3 +1,4 @@
+import logging
 import pygame
 import constants
 import math
@@ -5,6 +6,8 @@ import structures
 
 from spritesheet import SpriteSheet
 
+logger = logging.getLogger(__name__)
+
 ZERO = (230, 0, 30, 38)
 ONE = (196, 41, 26, 37)
 TWO = (55, 98, 32, 38)
@@ -16,6 +19,22 @@ SEVEN = (226, 206, 32, 39)
 EIGHT = (192, 206, 32, 40)
 NINE = (196, 0, 32, 39)
 
+DIGITS = (ZERO, ONE, TWO, THREE, FOUR, FIVE, SIX, SEVEN, EIGHT, NINE)
+
+# Pre-cut digit images shared by every Number, indexed by their value
+_digit_glyphs = []
+
+
+def digit_glyphs():
+    """Return the table of digit images, cutting them on first use."""
+    if not _digit_glyphs:
+        sprite_sheet = SpriteSheet("resources/hud_spritesheet.png")
+        for data in DIGITS:
+            _digit_glyphs.append(
+                sprite_sheet.get_image(data[0], data[1], data[2], data[3])
+            )
+    return _digit_glyphs
+
 
 class ScoreHUD:
     def __init__(self, player):
@@ -25,16 +44,12 @@ class ScoreHUD:
         self.score_tracker()
 
     def update(self):
-        """Update everything in this level."""
-        self.score_draw_list.update()
-        if self.player.score > self.last_score:
+        """Rebuild the score, but only if the player's score changed."""
+        if self.player.score != self.last_score:
             self.score_tracker()
 
     def draw(self, screen):
-        for i, number in enumerate(self.score_draw_list.sprites()):
-            number.rect.y = 10
-            number.rect.x = ((i + 0.01) * 55) + (constants.SCREEN_WIDTH - 100)
-        self.score_draw_list.draw(screen)
+        return self.score_draw_list.draw(screen)
 
     def score_tracker(self):
         score = self.player.score
@@ -50,8 +65,9 @@ class ScoreHUD:
             self.numbers.append(number)
             self.score_draw_list.add(number)
 
-        for number in self.numbers:
-            self.score_draw_list.add(number)
+        for i, number in enumerate(self.numbers):
+            number.rect.y = 10
+            number.rect.x = ((i + 0.01) * 55) + (constants.SCREEN_WIDTH - 100)
 
 
 class HUDItem(pygame.sprite.Sprite):
@@ -77,48 +93,10 @@ class Number(HUDItem):
     def __repr__(self):
         return "<Number: {}>".format(self.value)
 
-    def update(self):
-        self.get_image()
-
     def get_image(self):
         value = self.value
-        if value == 0:
-            self.image = self.sprite_sheet.get_image(ZERO[0], ZERO[1], ZERO[2], ZERO[3])
-            self.rect = self.image.get_rect()
-        elif value == 1:
-            self.image = self.sprite_sheet.get_image(ONE[0], ONE[1], ONE[2], ONE[3])
-            self.rect = self.image.get_rect()
-        elif value == 2:
-            self.image = self.sprite_sheet.get_image(TWO[0], TWO[1], TWO[2], TWO[3])
-            self.rect = self.image.get_rect()
-        elif value == 3:
-            self.image = self.sprite_sheet.get_image(
-                THREE[0], THREE[1], THREE[2], THREE[3]
-            )
-            self.rect = self.image.get_rect()
-        elif value == 4:
-            self.image = self.sprite_sheet.get_image(FOUR[0], FOUR[1], FOUR[2], FOUR[3])
-            self.rect = self.image.get_rect()
-        elif value == 5:
-            self.image = self.sprite_sheet.get_image(FIVE[0], FIVE[1], FIVE[2], FIVE[3])
-            self.rect = self.image.get_rect()
-        elif value == 6:
-            self.image = self.sprite_sheet.get_image(SIX[0], SIX[1], SIX[2], SIX[3])
-            self.rect = self.image.get_rect()
-        elif value == 7:
-            self.image = self.sprite_sheet.get_image(
-                SEVEN[0], SEVEN[1], SEVEN[2], SEVEN[3]
-            )
-            self.rect = self.image.get_rect()
-        elif value == 8:
-            self.image = self.sprite_sheet.get_image(
-                EIGHT[0], EIGHT[1], EIGHT[2], EIGHT[3]
-            )
-            self.rect = self.image.get_rect()
-        elif value == 9:
-            self.image = self.sprite_sheet.get_image(NINE[0], NINE[1], NINE[2], NINE[3])
+        if value in range(len(DIGITS)):
+            self.image = digit_glyphs()[value]
             self.rect = self.image.get_rect()
         else:
-            print("Error in score creation")
-            print("Value: {}".format(value))
-            print(type(value))
+            logger.error("No digit image for %r", value)
@@ -0,0 +1,164 @@
+"""
+Module for running Homeward without a window.
+
+The game is stepped as fast as the CPU allows, driven by a script of the
+actions to hold down rather than the keyboard. Drawing is skipped unless
+asked for, in which case frames are drawn with SDL's dummy video driver.
+
+Run it from the command line to see how many frames a second we manage:
+
+    python simulation.py --frames 10000 --level 2
+
+The run can be recorded, or a recording played back instead, see replay.py:
+
+    python simulation.py --record demo.hwr
+    python simulation.py --replay demo.hwr
+"""
+import argparse
+import itertools
+import os
+import time
+
+import pygame
+
+import constants
+import game
+
+from render import FullRenderer
+from replay import Recorder, Replay
+from timing import SimulationClock
+
+# Walk right, jumping every so often. Enough to get through most levels.
+DEMO_SCRIPT = [
+    ((game.RIGHT,), 40),
+    ((game.RIGHT, game.JUMP), 1),
+    ((game.RIGHT,), 25),
+    ((game.RIGHT, game.JUMP), 1),
+    ((), 5),
+    ((game.LEFT,), 10),
+    ((game.LEFT, game.JUMP), 1),
+    ((game.RIGHT,), 20),
+]
+
+
+def init_display():
+    """Start pygame without opening a window. A display mode is still set
+    as images can't be converted without one."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+    size = [constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT]
+    return pygame.display.set_mode(size)
+
+
+def scripted_inputs(script, loop=False):
+    """Turn a script of (actions, number of frames) pairs into the set of
+    actions held on each frame."""
+    steps = itertools.cycle(script) if loop else script
+    for actions, frames in steps:
+        actions = frozenset(actions)
+        for _ in range(frames):
+            yield actions
+
+
+class Simulation(object):
+    """Runs a Game headless, one frame per step."""
+
+    def __init__(self, level_no=0, render=False, clock=None, level_classes=None):
+        self.screen = init_display()
+        self.game = game.Game(level_no, clock, level_classes)
+        self.renderer = FullRenderer(self.screen) if render else None
+        self.frame = 0
+
+    @classmethod
+    def from_replay(cls, replay, render=False):
+        """Return a simulation of a new game set up like a recorded one."""
+        return cls(replay.level_no, render, SimulationClock(replay.step_rate))
+
+    def step(self, actions=None):
+        """Hold down actions and move the game on one frame. If actions is
+        None the game is given no input other than what is queued."""
+        if actions is not None:
+            self.game.set_held(actions)
+        self.game.update()
+        if self.renderer is not None:
+            with self.game.profiler.section("draw"):
+                self.renderer.draw(
+                    self.game.current_level,
+                    self.game.active_sprite_list,
+                    self.game.huds,
+                )
+        self.frame += 1
+
+    def run(self, inputs, frames=None):
+        """Step through inputs, one set of held actions per frame, until
+        they run out or frames frames have been simulated. Returns how
+        many frames were run and how fast."""
+        start = time.perf_counter()
+        count = 0
+        for actions in inputs:
+            if (frames is not None and count >= frames) or self.game.done:
+                break
+            self.step(actions)
+            count += 1
+        seconds = time.perf_counter() - start
+        return self.result(count, seconds)
+
+    def run_replay(self, replay):
+        """Play a recording through the game, which should be new. Returns the
+        same as run, plus whether the game ended up where the recording
+        did."""
+        start = time.perf_counter()
+        count = 0
+        for step_inputs in replay.step_inputs():
+            for kind, action in step_inputs:
+                self.game.queue(kind, action)
+            self.step()
+            count += 1
+        seconds = time.perf_counter() - start
+        result = self.result(count, seconds)
+        result["matches"] = replay.matches(self.game)
+        return result
+
+    def result(self, count, seconds):
+        return {
+            "frames": count,
+            "seconds": seconds,
+            "fps": count / seconds if seconds else 0.0,
+            "level": self.game.current_level_no,
+            "health": self.game.player.health,
+            "score": self.game.player.score,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Homeward headless.")
+    parser.add_argument("--frames", type=int, default=3600)
+    parser.add_argument("--level", type=int, default=0, help="level to start on")
+    parser.add_argument("--render", action="store_true", help="draw every frame")
+    parser.add_argument("--record", metavar="FILE", help="save the run to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="play back FILE")
+    args = parser.parse_args()
+
+    if args.replay:
+        replay = Replay.load(args.replay)
+        simulation = Simulation.from_replay(replay, render=args.render)
+        result = simulation.run_replay(replay)
+    else:
+        simulation = Simulation(args.level, render=args.render)
+        recorder = Recorder(simulation.game) if args.record else None
+        result = simulation.run(scripted_inputs(DEMO_SCRIPT, loop=True), args.frames)
+        if recorder is not None:
+            recorder.stop().save(args.record)
+
+    print(
+        "{frames} frames in {seconds:.2f}s ({fps:.0f} fps), "
+        "finished on level {level} with {health} health "
+        "and {score} points".format(**result)
+    )
+    if args.replay:
+        print("Matches recording" if result["matches"] else "Differs from recording")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""
+Module for saving the state of a game at one moment and going back to it.
+
+A Snapshot holds everything that changes as a game is played: the player,
+the clock, the camera of each level built so far, where every moving
+platform and enemy is, which enemies have been killed, and which parts of
+a streamed level are loaded. Numbers are packed into one array of doubles
+and everything else, such as which sprites are in each group and their
+images, is kept as references, so taking a snapshot copies no sprites or
+images:
+
+    saved = snapshot.take(game)
+    ...
+    snapshot.restore(game, saved)
+
+A game restored from a snapshot plays on exactly as it did the first time
+it got there. Snapshots can be restored any number of times, so they can
+be used for quick saves, rewinding and trying out different inputs from
+the same point. They only work with the game they were taken from, as the
+sprites are shared rather than copied.
+
+A History keeps a snapshot every so many steps, to rewind the game by:
+
+    history = snapshot.History(game)
+    ...
+    game.update()
+    history.record()
+    ...
+    history.rewind(seconds=2)
+"""
+import array
+import collections
+import math
+
+import constants
+
+from movingplatforms import WaypointPath
+
+# Stored for numbers that aren't set
+MISSING = float("nan")
+
+
+class Snapshot(object):
+    """The state of a game at one moment, see take."""
+
+    def __init__(self, values, refs):
+        # Numbers, and then everything else, in the order take saves them
+        self.values = values
+        self.refs = refs
+
+    @property
+    def steps(self):
+        """Return the number of steps the game had run, saved first."""
+        return int(self.values[0])
+
+
+class _Reader(object):
+    """Reads back the parts of a snapshot in the order they were saved."""
+
+    def __init__(self, snapshot):
+        self.values = snapshot.values
+        self.refs = snapshot.refs
+        self.value_index = 0
+        self.ref_index = 0
+
+    def int(self):
+        value = self.values[self.value_index]
+        self.value_index += 1
+        return int(value)
+
+    def ints(self, count):
+        """Return the next count numbers as ints."""
+        start = self.value_index
+        self.value_index += count
+        return list(map(int, self.values[start : self.value_index]))
+
+    def optional_int(self):
+        """Return an int saved with _optional, or None if it wasn't set."""
+        value = self.values[self.value_index]
+        self.value_index += 1
+        return None if math.isnan(value) else int(value)
+
+    def ref(self):
+        ref = self.refs[self.ref_index]
+        self.ref_index += 1
+        return ref
+
+
+def _optional(value):
+    return MISSING if value is None else value
+
+
+def _set_optional(sprite, name, value):
+    """Set an attribute that only some sprites have, or remove it."""
+    if value is None:
+        sprite.__dict__.pop(name, None)
+    else:
+        setattr(sprite, name, value)
+
+
+def _paths(level):
+    """Return the path of every moving platform in a level, including those
+    of a streamed level's released chunks, in a fixed order."""
+    paths = collections.OrderedDict()
+    for platform in level.platform_list.moving:
+        if platform.path is not None:
+            paths[platform.path] = None
+    if level.streamer is not None:
+        for entry in _entries(level.streamer):
+            if entry.state is not None and entry.state[3] is not None:
+                paths[entry.state[3]] = None
+    return list(paths)
+
+
+def _entries(streamer):
+    return [
+        entry for chunk in sorted(streamer.chunks) for entry in streamer.chunks[chunk]
+    ]
+
+
+def take(game):
+    """Return a Snapshot of a game."""
+    values = array.array("d")
+    refs = []
+    player = game.player
+
+    values.extend((game.clock.steps, game.current_level_no, game.done))
+    refs.extend((game.held, tuple(game.pending)))
+
+    values.extend(
+        (
+            player.rect.x,
+            player.rect.y,
+            player.change_x,
+            player.direction == "R",
+            player.health,
+            player.invincible,
+            player.score,
+            _optional(getattr(player, "last_hit", None)),
+            _optional(getattr(player, "death_time", None)),
+        )
+    )
+    # change_y is sometimes an int and sometimes a float, so is kept as is
+    refs.extend(
+        (player.change_y, getattr(player, "pos", None), player.image, player.level)
+    )
+
+    registry = game.level_list
+    refs.extend((dict(registry.levels), dict(registry.offsets)))
+    for level_no in sorted(registry.levels):
+        _take_level(registry.levels[level_no], values, refs)
+
+    return Snapshot(values, refs)
+
+
+def _take_level(level, values, refs):
+    enemy_list = level.enemy_list
+    # Far away and batched enemies aren't always where they should be
+    enemy_list.sync()
+    values.extend((level.camera.offset, enemy_list.frame))
+
+    streamer = level.streamer
+    if streamer is None:
+        # Only streamed levels add and remove platforms as they are played
+        refs.append(None)
+    else:
+        refs.append(tuple(level.platform_list))
+        entries = tuple(_entries(streamer))
+        refs.extend(
+            (
+                entries,
+                tuple(entry.sprite for entry in entries),
+                tuple(entry.state for entry in entries),
+                frozenset(entry for entry in entries if entry.killed),
+                frozenset(streamer.loaded),
+                streamer.wanted,
+            )
+        )
+
+    moving = tuple(level.platform_list.moving)
+    refs.append(moving)
+    for platform in moving:
+        values.extend(
+            (platform.rect.x, platform.rect.y, platform.change_x, platform.change_y)
+        )
+
+    # Paths are saved separately as released platforms keep theirs too
+    paths = _paths(level)
+    refs.append(tuple(paths))
+    for path in paths:
+        if isinstance(path, WaypointPath):
+            values.append(path.index)
+            refs.append(path.position)
+        else:
+            values.append(path.steps)
+
+    enemies = tuple(sorted(enemy_list.order, key=enemy_list.order.get))
+    refs.append(enemies)
+    for enemy in enemies:
+        values.extend((enemy.rect.x, enemy.rect.y, enemy.change_x, enemy.alive))
+        refs.extend((enemy.image, getattr(enemy, "time_killed", None)))
+
+
+def restore(game, snapshot):
+    """Put a game back how it was when a Snapshot was taken of it."""
+    reader = _Reader(snapshot)
+    player = game.player
+
+    game.clock.steps = reader.int()
+    level_no = reader.int()
+    game.done = bool(reader.int())
+    game.held = reader.ref()
+    game.pending = list(reader.ref())
+
+    player.rect.x = reader.int()
+    player.rect.y = reader.int()
+    player.change_x = reader.int()
+    player.direction = "R" if reader.int() else "L"
+    player.health = reader.int()
+    player.invincible = bool(reader.int())
+    player.score = reader.int()
+    _set_optional(player, "last_hit", reader.optional_int())
+    _set_optional(player, "death_time", reader.optional_int())
+    player.change_y = reader.ref()
+    _set_optional(player, "pos", reader.ref())
+    player.image = reader.ref()
+    player.level = reader.ref()
+
+    registry = game.level_list
+    registry.levels = reader.ref().copy()
+    registry.offsets = reader.ref().copy()
+    for saved_level_no in sorted(registry.levels):
+        _restore_level(registry.levels[saved_level_no], reader)
+
+    game.current_level_no = level_no
+    game.current_level = registry.levels[level_no]
+    game.game_HUD.update()
+    game.score_HUD.update()
+
+
+def _restore_level(level, reader):
+    level.camera.offset = reader.int()
+    frame = reader.int()
+
+    platforms = reader.ref()
+    streamer = level.streamer
+    if streamer is not None:
+        platform_list = level.platform_list
+        if list(platform_list) != list(platforms):
+            platform_list.empty()
+            platform_list.add(*platforms)
+        entries = reader.ref()
+        sprites = reader.ref()
+        states = reader.ref()
+        killed = reader.ref()
+        for entry, sprite, state in zip(entries, sprites, states):
+            entry.sprite = sprite
+            entry.state = state
+            entry.killed = entry in killed
+        streamer.loaded = set(reader.ref())
+        streamer.wanted = reader.ref()
+
+    moving = reader.ref()
+    numbers = iter(reader.ints(len(moving) * 4))
+    for platform, x, y, change_x, change_y in zip(
+        moving, numbers, numbers, numbers, numbers
+    ):
+        platform.rect.topleft = x, y
+        platform.change_x = change_x
+        platform.change_y = change_y
+
+    for path in reader.ref():
+        if isinstance(path, WaypointPath):
+            path.index = reader.int()
+            path.position = reader.ref()
+        else:
+            path.steps = reader.int()
+
+    enemies = reader.ref()
+    numbers = iter(reader.ints(len(enemies) * 4))
+    for enemy, x, y, change_x, alive in zip(
+        enemies, numbers, numbers, numbers, numbers
+    ):
+        enemy.rect.topleft = x, y
+        enemy.change_x = change_x
+        enemy.alive = bool(alive)
+        enemy.image = reader.ref()
+        _set_optional(enemy, "time_killed", reader.ref())
+    level.enemy_list.restore(enemies, frame)
+
+
+class History(object):
+    """Snapshots of a game taken every interval steps, the newest length of
+    them kept."""
+
+    def __init__(self, game, interval=10, length=60):
+        self.game = game
+        self.interval = interval
+        self.snapshots = collections.deque(maxlen=length)
+
+    def record(self):
+        """Called after each step, takes a snapshot if one is due."""
+        if self.game.clock.steps % self.interval == 0:
+            self.snapshots.append(take(self.game))
+
+    def rewind(self, seconds=1):
+        """Put the game back to the newest snapshot at least seconds old,
+        or the oldest there is. Later snapshots are dropped. Returns
+        whether there was anything to go back to."""
+        steps = self.game.clock.steps - seconds * constants.STEPS_PER_SECOND
+        while len(self.snapshots) > 1 and self.snapshots[-1].steps > steps:
+            self.snapshots.pop()
+        if not self.snapshots:
+            return False
+        restore(self.game, self.snapshots[-1])
+        return True
@@ -0,0 +1,75 @@
+"""
+Module for finding sprites by where they are in the world.
+"""
+
+
+class SpatialHash(object):
+    """Uniform grid of buckets used to find the sprites near a rect without
+    looking at every sprite in a level.
+
+    Sprites are expected not to move while they are in the hash. Results
+    are returned in the order the sprites were added, so drawing and
+    collision handling match the order of a normal sprite group."""
+
+    def __init__(self, cell_size=70):
+        self.cell_size = cell_size
+        self._cells = {}
+        self._order = {}
+        self._next = 0
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, sprite):
+        return sprite in self._order
+
+    def __iter__(self):
+        return iter(sorted(self._order, key=self._order.get))
+
+    def _cells_for(self, rect):
+        """Yield the keys of every cell the rect covers."""
+        size = self.cell_size
+        left = rect.left // size
+        right = max(rect.right - 1, rect.left) // size
+        top = rect.top // size
+        bottom = max(rect.bottom - 1, rect.top) // size
+        for cell_x in range(left, right + 1):
+            for cell_y in range(top, bottom + 1):
+                yield cell_x, cell_y
+
+    def add(self, sprite):
+        if sprite in self._order:
+            return
+        self._order[sprite] = self._next
+        self._next += 1
+        for key in self._cells_for(sprite.rect):
+            self._cells.setdefault(key, []).append(sprite)
+
+    def remove(self, sprite):
+        if sprite not in self._order:
+            return
+        del self._order[sprite]
+        for key in self._cells_for(sprite.rect):
+            cell = self._cells[key]
+            cell.remove(sprite)
+            if not cell:
+                del self._cells[key]
+
+    def clear(self):
+        self._cells.clear()
+        self._order.clear()
+
+    def nearby(self, rect):
+        """Return every sprite sharing a cell with rect, in the order they
+        were added. These may not actually touch rect."""
+        cells = self._cells
+        found = set()
+        for key in self._cells_for(rect):
+            cell = cells.get(key)
+            if cell:
+                found.update(cell)
+        return sorted(found, key=self._order.get)
+
+    def query(self, rect):
+        """Return every sprite whose rect collides with rect."""
+        return [sprite for sprite in self.nearby(rect) if rect.colliderect(sprite.rect)]
@@ -1,11 +1,143 @@
 """
 This module is used to pull individual sprites from sprite sheets.
+
+Sprite sheets and the images cut out of them are cached for the whole
+process, so every sheet is only decoded once and every sub-image is only
+cut once no matter how many sprites ask for it. The collision masks of the
+animation frames of sprites that collide by pixel are worked out when they
+are cut, so pixels only have to be compared when two sprites' rects already
+overlap, see overlaps.
 """
+import weakref
+
+from collections import OrderedDict
+
 import pygame
 
 import constants
 
 
+class ImageCache(object):
+    """Memoizes sub-images cut out of sprite sheets.
+
+    Entries are keyed by the sheet's file name and the rect of the image.
+    If max_size is set the least recently used entries are evicted once the
+    cache grows past it. Hits and misses are counted so the cache can be
+    tuned."""
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+
+    def __len__(self):
+        return len(self._images)
+
+    def get(self, key):
+        """Return the cached image for key or None if it is not cached."""
+        image = self._images.get(key)
+        if image is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        if self.max_size is not None:
+            self._images.move_to_end(key)
+        return image
+
+    def put(self, key, image):
+        """Store an image, evicting the oldest entries if we are full."""
+        self._images[key] = image
+        if self.max_size is not None:
+            while len(self._images) > self.max_size:
+                self._images.popitem(last=False)
+
+    def clear(self):
+        self._images.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Decoded sprite sheets and other images, keyed by file name
+_sheets = {}
+
+# Images decoded ahead of time by preload_image, waiting to be converted
+_preloaded = {}
+
+# Images cut out of the sprite sheets
+image_cache = ImageCache()
+
+# Collision masks of images, forgotten along with the image
+_masks = weakref.WeakKeyDictionary()
+
+
+def load_image(file_name):
+    """Load an image file once and return the shared, converted surface."""
+    image = _sheets.get(file_name)
+    if image is None:
+        image = _preloaded.pop(file_name, None)
+        if image is None:
+            image = pygame.image.load(file_name)
+        image = image.convert()
+        _sheets[file_name] = image
+    return image
+
+
+def preload_image(file_name):
+    """Decode an image file so a later load_image only has to convert it.
+    This doesn't touch the display, so it is safe to call from a
+    background thread."""
+    if file_name not in _sheets and file_name not in _preloaded:
+        _preloaded[file_name] = pygame.image.load(file_name)
+
+
+def unload_image(file_name):
+    """Forget a loaded image so its memory can be freed once nothing else
+    is using it."""
+    _sheets.pop(file_name, None)
+    _preloaded.pop(file_name, None)
+
+
+def clear_cache():
+    """Forget every cached sheet and image. Needed if the display mode is
+    changed, as converted surfaces are tied to it."""
+    _sheets.clear()
+    _preloaded.clear()
+    image_cache.clear()
+    _masks.clear()
+
+
+def get_mask(image):
+    """Return the collision mask of an image, making it the first time.
+    Pixels of the image's colorkey are left out."""
+    mask = _masks.get(image)
+    if mask is None:
+        mask = pygame.mask.from_surface(image)
+        _masks[image] = mask
+    return mask
+
+
+def overlaps(sprite, other):
+    """Return whether the pixels of two sprites' images overlap where their
+    rects put them. Much slower than comparing rects, so only worth doing
+    once they are known to overlap."""
+    offset = (other.rect.x - sprite.rect.x, other.rect.y - sprite.rect.y)
+    return get_mask(sprite.image).overlap(get_mask(other.image), offset) is not None
+
+
+def cache_info():
+    """Return a dictionary describing the state of the caches."""
+    return {
+        "sheets": len(_sheets),
+        "images": len(image_cache),
+        "masks": len(_masks),
+        "max_size": image_cache.max_size,
+        "hits": image_cache.hits,
+        "misses": image_cache.misses,
+    }
+
+
 class SpriteSheet(object):
     """Class used to grab images out of a sprite sheet."""
 
@@ -15,22 +147,43 @@ class SpriteSheet(object):
     def __init__(self, file_name):
         """Constructor. Pass in the file name of the sprite sheet."""
 
-        # Load the sprite sheet.
-        self.sprite_sheet = pygame.image.load(file_name).convert()
+        # Load the sprite sheet, or reuse it if it has already been loaded.
+        self.file_name = file_name
+        self.sprite_sheet = load_image(file_name)
 
-    def get_image(self, x, y, width, height):
+    def get_image(self, x, y, width, height, flipped=False, mask=False):
         """Grab a single image out of a larger spritesheet
         Pass in the x, y location of the sprite
-        and the width and height of the sprite."""
+        and the width and height of the sprite.
+        Pass flipped to have it mirrored left to right,
+        and mask to have its collision mask made now rather than on first use.
+
+        The returned image is shared with every other caller asking for the
+        same rect, so it must not be drawn on."""
+
+        key = (self.file_name, x, y, width, height, flipped)
+        image = image_cache.get(key)
+        if image is not None:
+            if mask:
+                get_mask(image)
+            return image
+
+        if flipped:
+            image = self.get_image(x, y, width, height)
+            image = pygame.transform.flip(image, True, False)
+        else:
+            # Create a new blank image
+            image = pygame.Surface([width, height]).convert()
 
-        # Create a new blank image
-        image = pygame.Surface([width, height]).convert()
+            # Copy the sprite from the large sheet onto the smaller image
+            image.blit(self.sprite_sheet, (0, 0), (x, y, width, height))
 
-        # Copy the sprite from the large sheet onto the smaller image
-        image.blit(self.sprite_sheet, (0, 0), (x, y, width, height))
+            # Assuming black works as the transparent color
+            image.set_colorkey(constants.BLACK)
 
-        # Assuming black works as the transparent color
-        image.set_colorkey(constants.BLACK)
+        image_cache.put(key, image)
+        if mask:
+            get_mask(image)
 
         # Return the image
         return image
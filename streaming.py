@@ -0,0 +1,167 @@
+"""
+Module for building very wide levels a chunk at a time.
+
+A streamed level is split into columns of the world CHUNK_WIDTH wide. Only
+the chunks near the camera and the player have sprites; the rest are kept
+as the level data they were built from. Enemies and moving platforms in a
+chunk that is released remember where they got to, and enemies that were
+killed stay dead, so the level looks the same when the player comes back.
+"""
+import constants
+
+# Kinds of things a level is built from
+PLATFORM = "platform"
+MOVING_PLATFORM = "moving_platform"
+ENEMY = "enemy"
+
+
+def level_width(data):
+    """Return how wide the world described by some level data is."""
+    lefts = []
+    rights = []
+    for name, x, y in data["tiles"]:
+        lefts.append(x)
+        rights.append(x)
+    for name, x, y, length in data["floors"]:
+        lefts.append(x)
+        rights.append(x + length)
+    for platform in data["moving_platforms"]:
+        lefts.append(min(platform["x"], platform["boundary_left"]))
+        rights.append(max(platform["x"], platform["boundary_right"]))
+    for name, x, y in data["enemies"]:
+        lefts.append(x)
+        rights.append(x)
+    if not lefts:
+        return 0
+    return max(rights) - min(lefts)
+
+
+def spec_x(kind, spec):
+    """Return the x position that decides which chunk something is in."""
+    if kind == MOVING_PLATFORM:
+        # Moving platforms belong where the middle of their path is, so they
+        # aren't released while they are still coming back into view
+        if spec["boundary_right"] > spec["boundary_left"]:
+            return (spec["boundary_left"] + spec["boundary_right"]) // 2
+        return spec["x"]
+    return spec[1]
+
+
+class _Entry(object):
+    """Something in a streamed level, and its sprite if its chunk is
+    loaded."""
+
+    def __init__(self, kind, spec):
+        self.kind = kind
+        self.spec = spec
+        self.sprite = None
+        # Position, speed and path saved when the chunk was released
+        self.state = None
+        self.killed = False
+
+
+class ChunkStreamer(object):
+    """Creates the sprites for the chunks of a level near the camera and
+    removes them again once they are left behind.
+
+    Chunks within margin chunks of the screen or the player are loaded.
+    They are only released once they are more than keep chunks away, so
+    walking back and forth over the edge of a chunk doesn't build and
+    throw it away every frame."""
+
+    def __init__(self, level, chunk_width=None, margin=1, keep=2):
+        self.level = level
+        self.chunk_width = chunk_width or constants.CHUNK_WIDTH
+        self.margin = margin
+        self.keep = max(keep, margin)
+
+        self.chunks = {}
+        self.loaded = set()
+        # Range of chunks wanted last update, so nothing is done until the
+        # camera or player moves into another chunk
+        self.wanted = None
+
+    def chunk_of(self, x):
+        return int(x // self.chunk_width)
+
+    def add(self, kind, spec):
+        """Add something to the level, to be created when its chunk is
+        loaded."""
+        chunk = self.chunk_of(spec_x(kind, spec))
+        entry = _Entry(kind, spec)
+        self.chunks.setdefault(chunk, []).append(entry)
+        if chunk in self.loaded:
+            self.create(entry)
+
+    def span(self):
+        """Return the first and last chunk the camera or player is in."""
+        view = self.level.camera.view()
+        left = view.left
+        right = view.right
+        player = self.level.player
+        if player is not None:
+            left = min(left, player.rect.left)
+            right = max(right, player.rect.right)
+        return self.chunk_of(left), self.chunk_of(right - 1)
+
+    def update(self):
+        """Load the chunks around the camera and release far away ones."""
+        first, last = self.span()
+        if self.wanted == (first, last):
+            return
+        self.wanted = (first, last)
+
+        for chunk in range(first - self.margin, last + self.margin + 1):
+            if chunk not in self.loaded and chunk in self.chunks:
+                self.load(chunk)
+
+        for chunk in list(self.loaded):
+            if chunk < first - self.keep or chunk > last + self.keep:
+                self.release(chunk)
+
+    def load(self, chunk):
+        """Create the sprites for a chunk."""
+        self.loaded.add(chunk)
+        for entry in self.chunks[chunk]:
+            if not entry.killed:
+                self.create(entry)
+
+    def create(self, entry):
+        """Create the sprite for an entry, back where it was left."""
+        sprite = self.level.create(entry.kind, entry.spec)
+        if sprite is not None and entry.state is not None:
+            sprite.rect.topleft, sprite.change_x, change_y, path = entry.state
+            if entry.kind == MOVING_PLATFORM:
+                sprite.change_y = change_y
+                sprite.path = path
+        entry.sprite = sprite
+
+    def release(self, chunk):
+        """Remove the sprites of a chunk from the level."""
+        self.loaded.discard(chunk)
+        enemy_list = self.level.enemy_list
+        # Far away enemies are behind where they should be, see EnemyGroup
+        enemy_list.sync()
+        for entry in self.chunks[chunk]:
+            sprite = entry.sprite
+            if sprite is None:
+                continue
+            entry.sprite = None
+            if entry.kind == ENEMY and (sprite not in enemy_list or not sprite.alive):
+                # Killed, or falling off the screen after being stomped
+                entry.killed = True
+            elif entry.kind != PLATFORM:
+                # Only moving things have anywhere new to remember
+                entry.state = (
+                    sprite.rect.topleft,
+                    sprite.change_x,
+                    getattr(sprite, "change_y", 0),
+                    getattr(sprite, "path", None),
+                )
+            sprite.kill()
+
+    def clear(self):
+        """Release every loaded chunk."""
+        for chunk in list(self.loaded):
+            self.release(chunk)
+        self.wanted = None
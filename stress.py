@@ -0,0 +1,181 @@
+"""
+Module for making up levels far bigger than the real ones, to see how the
+game copes with them.
+
+Levels are generated from a seed, so the same settings always give the
+same level:
+
+    data = stress.generate(seed=1, width=50000, flies=2000, slimes=2000)
+    level_class = stress.level_class(data)
+
+The class can be played like any other level, see stress_levels. Run this
+module to see how much is in a generated level:
+
+    python stress.py --width 100000 --flies 5000 --slimes 5000
+"""
+import argparse
+import random
+
+import constants
+import levels
+
+from movingplatforms import CIRCLE, WAYPOINTS
+
+BACKGROUND = "resources/grass_background.png"
+
+# Top of the floor, which slimes walk along
+FLOOR_Y = 575
+SLIME_HEIGHT = 28
+
+
+def generate(
+    seed=0,
+    width=20000,
+    tile_density=0.2,
+    moving_platforms=20,
+    flies=50,
+    slimes=50,
+):
+    """Return level data, as from levelformat, for a level width pixels wide.
+
+    tile_density is the fraction of the level with floating platforms over
+    it. The floor has gaps in it every so often, and every tenth moving
+    platform follows a waypoint or circle path rather than going back and
+    forth."""
+    rng = random.Random(seed)
+
+    # A floor with gaps, starting and ending on solid ground
+    floors = []
+    x = -5
+    while x < width:
+        length = rng.randrange(7, 30) * 70
+        floors.append(("GRASS_MIDDLE", x, FLOOR_Y, min(length, width - x + 70)))
+        x += length + rng.randrange(2, 4) * 70
+
+    # Floating platforms, LEFT, a few MIDDLEs and a RIGHT
+    tiles = [("INVISIBLE_WALL", 0, 0)]
+    columns = width // 70
+    for _ in range(int(columns * tile_density / 3)):
+        x = rng.randrange(5, max(columns - 5, 6)) * 70
+        y = rng.randrange(15, 46) * 10
+        middles = rng.randrange(0, 3)
+        tiles.append(("STONE_PLATFORM_LEFT", x, y))
+        for i in range(middles):
+            tiles.append(("STONE_PLATFORM_MIDDLE", x + 70 * (i + 1), y))
+        tiles.append(("STONE_PLATFORM_RIGHT", x + 70 * (middles + 1), y))
+
+    platforms = []
+    for i in range(moving_platforms):
+        x = rng.randrange(1000, max(width - 300, 1001))
+        y = rng.randrange(10, 45) * 10
+        platform = {
+            "tile": "STONE_PLATFORM_MIDDLE",
+            "x": x,
+            "y": y,
+            "change_x": 0,
+            "change_y": 0,
+            "boundary_left": 0,
+            "boundary_right": 0,
+            "boundary_top": 0,
+            "boundary_bottom": 0,
+            "path": None,
+        }
+        if i % 10 == 9:
+            if rng.random() < 0.5:
+                points = [(x, y)]
+                for _ in range(rng.randrange(2, 5)):
+                    points.append(
+                        (x + rng.randrange(-200, 201), rng.randrange(10, 45) * 10)
+                    )
+                platform["path"] = {
+                    "type": WAYPOINTS,
+                    "speed": rng.randrange(1, 4),
+                    "points": points,
+                }
+            else:
+                platform["path"] = {
+                    "type": CIRCLE,
+                    "centre": (x, y),
+                    "radius": rng.randrange(50, 150),
+                    "period": rng.randrange(120, 480),
+                    "start": 0,
+                }
+        elif rng.random() < 0.5:
+            platform["change_x"] = rng.choice((-3, -2, -1, 1, 2, 3))
+            platform["boundary_left"] = x
+            platform["boundary_right"] = x + rng.randrange(100, 400)
+        else:
+            platform["change_y"] = rng.choice((-3, -2, -1, 1, 2, 3))
+            platform["boundary_top"] = 100
+            platform["boundary_bottom"] = 550
+        platforms.append(platform)
+
+    # Nothing right where the player starts
+    enemies = [
+        ("FLY", rng.randrange(1000, max(width, 1001)), rng.randrange(10, 45) * 10)
+        for _ in range(flies)
+    ]
+    enemies.extend(
+        ("SLIME", rng.randrange(1000, max(width, 1001)), FLOOR_Y - SLIME_HEIGHT)
+        for _ in range(slimes)
+    )
+
+    return {
+        "background": BACKGROUND,
+        # The level ends once the player is within a screen of the far end
+        "level_limit": constants.SCREEN_WIDTH - width,
+        "y_offset": 0,
+        "tiles": tiles,
+        "floors": floors,
+        "moving_platforms": platforms,
+        "enemies": enemies,
+    }
+
+
+def count(data):
+    """Return how many of each kind of thing are in some level data."""
+    floor_tiles = sum(length // 70 for _, _, _, length in data["floors"])
+    return {
+        "tiles": len(data["tiles"]) + floor_tiles,
+        "moving_platforms": len(data["moving_platforms"]),
+        "enemies": len(data["enemies"]),
+    }
+
+
+def level_class(data, name="StressLevel"):
+    """Return a Level class built from some level data."""
+    return type(name, (levels.Level,), {"level_data": data})
+
+
+def stress_levels(data):
+    """Return the list of levels to give a Game to play a generated level,
+    with the usual screens after it."""
+    return [level_class(data), levels.YouWin, levels.GameOver]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a stress level.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--width", type=int, default=20000)
+    parser.add_argument("--tile-density", type=float, default=0.2)
+    parser.add_argument("--moving-platforms", type=int, default=20)
+    parser.add_argument("--flies", type=int, default=50)
+    parser.add_argument("--slimes", type=int, default=50)
+    args = parser.parse_args()
+
+    data = generate(
+        args.seed,
+        args.width,
+        args.tile_density,
+        args.moving_platforms,
+        args.flies,
+        args.slimes,
+    )
+    print(
+        "{tiles} tiles, {moving_platforms} moving platforms "
+        "and {enemies} enemies".format(**count(data))
+    )
+
+
+if __name__ == "__main__":
+    main()
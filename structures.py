@@ -3,7 +3,10 @@ Module for managing platforms.
 """
 import pygame
 
+from movingplatforms import MovingPlatformSystem
+from spatial import SpatialHash
 from spritesheet import SpriteSheet
+from tilelayer import TileLayer
 
 # These constants define our platform types:
 #   Name of file
@@ -23,6 +26,21 @@ STONE_CLIFF_LEFT = (144, 432, 70, 70)
 STONE_CLIFF_MIDDLE = (72, 432, 70, 70)
 STONE_CLIFF_RIGHT = (144, 288, 70, 70)
 
+# Platform types by name, as used in level files
+TILES = {
+    "INVISIBLE_WALL": INVISIBLE_WALL,
+    "GRASS_LEFT": GRASS_LEFT,
+    "GRASS_RIGHT": GRASS_RIGHT,
+    "GRASS_MIDDLE": GRASS_MIDDLE,
+    "GRASS_ROUND": GRASS_ROUND,
+    "STONE_PLATFORM_LEFT": STONE_PLATFORM_LEFT,
+    "STONE_PLATFORM_MIDDLE": STONE_PLATFORM_MIDDLE,
+    "STONE_PLATFORM_RIGHT": STONE_PLATFORM_RIGHT,
+    "STONE_CLIFF_LEFT": STONE_CLIFF_LEFT,
+    "STONE_CLIFF_MIDDLE": STONE_CLIFF_MIDDLE,
+    "STONE_CLIFF_RIGHT": STONE_CLIFF_RIGHT,
+}
+
 
 class Platform(pygame.sprite.Sprite):
     """Platform the user can jump on"""
@@ -59,51 +77,137 @@ class MovingPlatform(Platform):
     level = None
     player = None
 
+    # Path to follow instead of going back and forth, see movingplatforms.py
+    path = None
+
     def update(self):
         """Move the platform.
         If the player is in the way, it will shove the player
         out of the way. This does NOT handle what happens if a
         platform shoves a player into another object. Make sure
         moving platforms have clearance to push the player around
-        or add code to handle what happens if they don't."""
-
-        # Move left/right
-        self.rect.x += self.change_x
-
-        # See if we hit the player
-        hit = pygame.sprite.collide_rect(self, self.player)
-        if hit:
-            # We did hit the player. Shove the player around and
-            # assume he/she won't hit anything else.
-
-            # If we are moving right, set our right side
-            # to the left side of the item we hit
-            if self.change_x < 0:
-                self.player.rect.right = self.rect.left
-            else:
-                # Otherwise if we are moving left, do the opposite.
-                self.player.rect.left = self.rect.right
-
-        # Move up/down
-        self.rect.y += self.change_y
-
-        # Check and see if we the player
-        hit = pygame.sprite.collide_rect(self, self.player)
-        if hit:
-            # We did hit the player. Shove the player around and
-            # assume he/she won't hit anything else.
-
-            # Reset our position based on the top/bottom of the object.
-            if self.change_y < 0:
-                self.player.rect.bottom = self.rect.top
+        or add code to handle what happens if they don't.
+
+        Platforms in a PlatformGroup are all moved at once by its
+        MovingPlatformSystem instead."""
+        MovingPlatformSystem([self]).update()
+
+
+class TileRun(object):
+    """A row of static platforms that touch end to end, collided with as one
+    rect. Stops the player catching on the seams between tiles."""
+
+    def __init__(self, rect, tiles):
+        self.rect = rect
+        self.tiles = tiles
+
+
+def merge_tiles(tiles):
+    """Return the TileRuns for tiles. Tiles are merged where they have the
+    same top and height and touch or overlap. Runs are in the order of the
+    first tile in each one."""
+    rows = {}
+    for order, tile in enumerate(tiles):
+        rect = tile.rect
+        if rect.width > 0 and rect.height > 0:
+            rows.setdefault((rect.top, rect.height), []).append(
+                (rect.left, order, tile)
+            )
+
+    runs = []
+    for row in rows.values():
+        row.sort(key=lambda item: (item[0], item[1]))
+        run = None
+        for left, order, tile in row:
+            if run is not None and left <= run[1].right:
+                run[1].union_ip(tile.rect)
+                run[0] = min(run[0], order)
+                run[2].append(tile)
             else:
-                self.player.rect.top = self.rect.bottom
-
-        # Check the boundaries and see if we need to reverse
-        # direction.
-        if self.rect.bottom > self.boundary_bottom or self.rect.top < self.boundary_top:
-            self.change_y *= -1
+                run = [order, tile.rect.copy(), [tile]]
+                runs.append(run)
+
+    runs.sort(key=lambda run: run[0])
+    return [TileRun(rect, run_tiles) for order, rect, run_tiles in runs]
+
+
+class PlatformGroup(pygame.sprite.Group):
+    """Sprite group for the platforms of a level.
+
+    Static platforms are kept in a spatial hash, with cells the size of a
+    tile, and are baked into a tile layer for drawing. For landing on and
+    hitting the underside of them, rows of them are merged into TileRuns,
+    which are worked out again the next time they are needed after a static
+    platform is added or removed. Sideways collisions are with single tiles,
+    see collide_tiles.
+
+    Moving platforms are kept in a plain list as they change position every
+    frame, and are all moved together by a MovingPlatformSystem."""
+
+    def __init__(self, *sprites):
+        self.static = SpatialHash()
+        self.layer = TileLayer()
+        self.moving = []
+        self.system = MovingPlatformSystem(self.moving)
+        self._runs = None
+        pygame.sprite.Group.__init__(self, *sprites)
+
+    def add_internal(self, sprite, *args):
+        pygame.sprite.Group.add_internal(self, sprite, *args)
+        if isinstance(sprite, MovingPlatform):
+            self.moving.append(sprite)
+        else:
+            self.static.add(sprite)
+            self.layer.add(sprite)
+            self._runs = None
+
+    def remove_internal(self, sprite):
+        pygame.sprite.Group.remove_internal(self, sprite)
+        if isinstance(sprite, MovingPlatform):
+            self.moving.remove(sprite)
+        else:
+            self.static.remove(sprite)
+            self.layer.remove(sprite)
+            self._runs = None
+
+    def update(self, *args):
+        """Move the moving platforms. Static platforms don't do anything."""
+        self.system.update()
+
+    @property
+    def runs(self):
+        """Spatial hash of the TileRuns of the static platforms."""
+        if self._runs is None:
+            self._runs = SpatialHash()
+            for run in merge_tiles(list(self.static)):
+                self._runs.add(run)
+        return self._runs
+
+    def collide(self, sprite):
+        """Return the tile runs and moving platforms sprite is touching.
+        Tile runs come first, in the order their tiles were added, then
+        moving platforms in the order pygame.sprite.spritecollide would
+        give them."""
+        rect = sprite.rect
+        platforms = self.runs.query(rect)
+        platforms.extend(
+            platform for platform in self.moving if rect.colliderect(platform.rect)
+        )
+        return platforms
+
+    def collide_tiles(self, sprite):
+        """Return the static and moving platforms sprite is touching, in the
+        same order as pygame.sprite.spritecollide would, but only looking at
+        nearby static platforms. A sprite pushed out sideways is pushed to
+        the edge of the tile it is in, not of the whole run, which could be
+        far away if it started the frame inside a row of tiles."""
+        rect = sprite.rect
+        platforms = self.static.query(rect)
+        platforms.extend(
+            platform for platform in self.moving if rect.colliderect(platform.rect)
+        )
+        return platforms
 
-        cur_pos = self.rect.x - self.level.world_shift
-        if cur_pos < self.boundary_left or cur_pos > self.boundary_right:
-            self.change_x *= -1
+    def moving_in(self, view):
+        """Return the moving platforms that overlap the view rect."""
+        return [platform for platform in self.moving if view.colliderect(platform.rect)]
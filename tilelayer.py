@@ -0,0 +1,76 @@
+"""
+Module for drawing the static tiles of a level in as few blits as possible.
+"""
+import pygame
+
+import constants
+
+
+class TileLayer(object):
+    """The static tiles of a level baked into a few large surfaces.
+
+    The world is split into columns one screen wide. The first time a
+    column is drawn its tiles are blitted onto a single surface, which is
+    then reused every frame until a tile in the column is added or
+    removed. Drawing the layer therefore takes one or two blits however
+    many tiles are on screen."""
+
+    def __init__(self, column_width=constants.SCREEN_WIDTH):
+        self.column_width = column_width
+        # Tiles in each column, in the order they were added
+        self._tiles = {}
+        # Baked (surface, top) for each column that is up to date
+        self._baked = {}
+
+    def _columns_for(self, rect):
+        width = self.column_width
+        return range(rect.left // width, max(rect.right - 1, rect.left) // width + 1)
+
+    def add(self, tile):
+        for column in self._columns_for(tile.rect):
+            self._tiles.setdefault(column, []).append(tile)
+            self._baked.pop(column, None)
+
+    def remove(self, tile):
+        for column in self._columns_for(tile.rect):
+            tiles = self._tiles.get(column)
+            if tiles and tile in tiles:
+                tiles.remove(tile)
+                if not tiles:
+                    del self._tiles[column]
+                self._baked.pop(column, None)
+
+    def clear(self):
+        self._tiles.clear()
+        self._baked.clear()
+
+    def bake(self, column):
+        """Draw every tile in a column onto one surface."""
+        tiles = self._tiles[column]
+
+        # Only the part of the column that can be on screen is kept
+        top = max(0, min(tile.rect.top for tile in tiles))
+        bottom = min(constants.SCREEN_HEIGHT, max(tile.rect.bottom for tile in tiles))
+        left = column * self.column_width
+
+        surface = pygame.Surface([self.column_width, max(bottom - top, 1)]).convert()
+        surface.fill(constants.BLACK)
+        for tile in tiles:
+            surface.blit(tile.image, (tile.rect.x - left, tile.rect.y - top))
+
+        # Tiles treat black as transparent, so the layer can do the same
+        surface.set_colorkey(constants.BLACK, pygame.RLEACCEL)
+
+        self._baked[column] = (surface, top)
+        return surface, top
+
+    def draw(self, screen, camera):
+        """Draw the columns the camera can see."""
+        for column in self._columns_for(camera.view()):
+            if column not in self._tiles:
+                continue
+            baked = self._baked.get(column)
+            if baked is None:
+                baked = self.bake(column)
+            surface, top = baked
+            screen.blit(surface, (camera.to_screen_x(column * self.column_width), top))
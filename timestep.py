@@ -0,0 +1,111 @@
+"""
+Module for running the game's simulation at a fixed rate, whatever rate
+frames are drawn at.
+
+All the physics in the game (gravity, walking speed, enemy and platform
+speeds) is in pixels per step. Running a fixed number of steps a second
+keeps the game the same speed and deterministic on fast and slow machines.
+"""
+
+
+class FixedTimestep(object):
+    """Accumulates the real time that passes between frames and says how
+    many fixed steps of the simulation to run to catch up with it."""
+
+    def __init__(self, step_rate=60, max_steps=5):
+        # Length of a step in seconds
+        self.step = 1.0 / step_rate
+        # Most steps to run in one frame, so a long stall doesn't freeze the
+        # game while it catches up
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def advance(self, elapsed):
+        """Add elapsed seconds and return how many steps should be run."""
+        self.accumulator += elapsed
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_steps:
+            # Too far behind, drop the time we can't make up
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self):
+        """How far we are between the last step and the next one, from 0
+        to 1. Used to interpolate what is drawn."""
+        return min(self.accumulator / self.step, 1.0)
+
+
+class Interpolator(object):
+    """Draws sprites part way between where they were before the last step
+    and where they are now, so movement looks smooth when frames are drawn
+    at a different rate to steps.
+
+    Call save before the last step of a frame, then apply before drawing
+    and restore straight after."""
+
+    # Anything that moves further than this in one step was teleported, so
+    # it is drawn where it is rather than part way
+    MAX_DISTANCE = 100
+
+    def __init__(self):
+        self.level = None
+        self.offset = 0
+        self.positions = {}
+        # What apply moved, so restore can put it back
+        self.real_offset = None
+        self.moved = []
+
+    def sprites(self, game):
+        level = game.current_level
+        sprites = list(game.active_sprite_list)
+        sprites.extend(level.platform_list.moving)
+        sprites.extend(level.enemy_list)
+        return sprites
+
+    def save(self, game):
+        """Remember where everything is before a step."""
+        self.level = game.current_level
+        self.offset = game.current_level.camera.offset
+        self.positions = {
+            sprite: (sprite.rect.x, sprite.rect.y) for sprite in self.sprites(game)
+        }
+
+    def apply(self, game, alpha):
+        """Move everything part way back to where it was, alpha being how far
+        from the saved positions to the current ones."""
+        self.moved = []
+        self.real_offset = None
+        level = game.current_level
+        if level is not self.level:
+            return
+
+        camera = level.camera
+        if abs(camera.offset - self.offset) <= self.MAX_DISTANCE:
+            self.real_offset = camera.offset
+            camera.offset = round(self.offset + (camera.offset - self.offset) * alpha)
+
+        for sprite, (x, y) in self.positions.items():
+            rect = sprite.rect
+            if (
+                abs(rect.x - x) > self.MAX_DISTANCE
+                or abs(rect.y - y) > self.MAX_DISTANCE
+            ):
+                continue
+            self.moved.append((sprite, rect.topleft))
+            rect.topleft = (
+                round(x + (rect.x - x) * alpha),
+                round(y + (rect.y - y) * alpha),
+            )
+
+    def restore(self):
+        """Put everything back where the simulation has it."""
+        if self.real_offset is not None:
+            self.level.camera.offset = self.real_offset
+            self.real_offset = None
+        for sprite, position in self.moved:
+            sprite.rect.topleft = position
+        self.moved = []
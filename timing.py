@@ -0,0 +1,65 @@
+"""
+Module for the time the game runs on.
+
+Anything in the game that times something, such as how long the player
+stays invincible after being hit, asks this module for the time rather
+than pygame. A Game runs each step using its own clock:
+
+    with timing.using(clock):
+        ...
+
+A SimulationClock counts steps rather than real time, so a game given the
+same input plays out exactly the same every time, however fast it runs.
+Outside of a game the time is pygame's.
+"""
+import contextlib
+
+import pygame
+
+import constants
+
+
+class RealClock(object):
+    """Time since pygame was started."""
+
+    def advance(self):
+        pass
+
+    def get_ticks(self):
+        return pygame.time.get_ticks()
+
+
+class SimulationClock(object):
+    """Time worked out from the number of steps that have been run."""
+
+    def __init__(self, step_rate=None, steps=0):
+        self.step_rate = step_rate or constants.STEPS_PER_SECOND
+        self.steps = steps
+
+    def advance(self):
+        """Move the time on by one step."""
+        self.steps += 1
+
+    def get_ticks(self):
+        return self.steps * 1000 // self.step_rate
+
+
+# Clock used by get_ticks
+_clock = RealClock()
+
+
+def get_ticks():
+    """Return the time in milliseconds on the clock in use."""
+    return _clock.get_ticks()
+
+
+@contextlib.contextmanager
+def using(clock):
+    """Use clock for the time until the end of the with block."""
+    global _clock
+    previous = _clock
+    _clock = clock
+    try:
+        yield clock
+    finally:
+        _clock = previous